@@ -1 +1,9 @@
-from .app import app
+from .factory import create_app
+
+def __getattr__(name):
+    # `from app import app` and `flask --app app` get a default application built on
+    # first use, so importing the models or helpers does not require DATABASE_URL.
+    if name == 'app':
+        application = globals()['app'] = create_app()
+        return application
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -0,0 +1,118 @@
+from collections import Counter
+from .models import db, User, Question, ExamSubmission, StudentAnswer, ExamStats, QuestionStats
+from .grading import get_answer_key
+
+ANSWER_FETCH_BATCH = 2000
+
+def get_exam_analytics(exam_id):
+    """Builds the per-student and per-question analytics of an exam from the stats tables.
+
+    Reads one exam_stats row, one row per question and one per submitted attempt.
+    Exams whose statistics have not been built yet (for example attempts submitted
+    before the stats tables existed) fall back to computing from raw answers.
+    """
+    exam_stats = db.session.get(ExamStats, exam_id)
+
+    submissions_query = db.session.query(
+        User.fullname, ExamSubmission.score, ExamSubmission.start_time, ExamSubmission.end_time,
+        ExamSubmission.answered_count, ExamSubmission.correct_count
+    ).join(User, ExamSubmission.student_id == User.id)\
+    .filter(ExamSubmission.exam_id == exam_id, ExamSubmission.status == 'submitted')\
+    .order_by(ExamSubmission.id).all()
+
+    if submissions_query and (exam_stats is None or any(row.answered_count is None for row in submissions_query)):
+        return compute_exam_analytics(exam_id)
+
+    questions_query = db.session.query(Question.question_text, QuestionStats.correct_count, QuestionStats.incorrect_count)\
+        .outerjoin(QuestionStats, QuestionStats.question_id == Question.id)\
+        .filter(Question.exam_id == exam_id).order_by(Question.id).all()
+    total_questions = len(questions_query)
+
+    submissions = [{
+        'fullname': row.fullname,
+        'score': row.score,
+        'total_questions': total_questions,
+        'answered_questions': row.answered_count,
+        'unanswered_questions': total_questions - row.answered_count,
+        'correct_answers': row.correct_count,
+        'incorrect_answers': row.answered_count - row.correct_count,
+        'time_taken': row.end_time - row.start_time if row.end_time and row.start_time else None
+    } for row in submissions_query]
+
+    question_analysis = [{
+        'question_text': question_text,
+        'correct_count': correct_count or 0,
+        'incorrect_count': incorrect_count or 0
+    } for question_text, correct_count, incorrect_count in questions_query]
+
+    average_score = exam_stats.score_sum / exam_stats.submission_count if exam_stats and exam_stats.submission_count else 0
+
+    return {
+        'submissions': submissions,
+        'question_analysis': question_analysis,
+        'average_score': average_score
+    }
+
+def compute_exam_analytics(exam_id):
+    """Builds the same analytics as get_exam_analytics directly from raw answers.
+
+    Uses a fixed number of queries regardless of class size: the questions, the
+    submitted attempts with student names, and one streamed fetch of their answers
+    that is graded against the cached answer key.
+    """
+    all_questions = db.session.query(Question.id, Question.question_text)\
+        .filter(Question.exam_id == exam_id).order_by(Question.id).all()
+    total_questions = len(all_questions)
+
+    submissions_query = db.session.query(
+        ExamSubmission.id, User.fullname, ExamSubmission.score, ExamSubmission.start_time, ExamSubmission.end_time
+    ).join(User, ExamSubmission.student_id == User.id)\
+    .filter(ExamSubmission.exam_id == exam_id, ExamSubmission.status == 'submitted')\
+    .order_by(ExamSubmission.id).all()
+
+    answer_key = get_answer_key(exam_id)
+    answered = Counter()
+    correct = Counter()
+    question_answered = Counter()
+    question_correct = Counter()
+
+    answers_query = db.session.query(StudentAnswer.submission_id, StudentAnswer.question_id, StudentAnswer.answer_text)\
+        .join(ExamSubmission, StudentAnswer.submission_id == ExamSubmission.id)\
+        .filter(ExamSubmission.exam_id == exam_id, ExamSubmission.status == 'submitted')\
+        .yield_per(ANSWER_FETCH_BATCH)
+    for submission_id, question_id, answer_text in answers_query:
+        is_correct = answer_key.is_correct(question_id, answer_text)
+        answered[submission_id] += 1
+        question_answered[question_id] += 1
+        if is_correct:
+            correct[submission_id] += 1
+            question_correct[question_id] += 1
+
+    submissions = []
+    for submission_id, fullname, score, start_time, end_time in submissions_query:
+        answered_questions = answered[submission_id]
+        correct_answers = correct[submission_id]
+        submissions.append({
+            'fullname': fullname,
+            'score': score,
+            'total_questions': total_questions,
+            'answered_questions': answered_questions,
+            'unanswered_questions': total_questions - answered_questions,
+            'correct_answers': correct_answers,
+            'incorrect_answers': answered_questions - correct_answers,
+            'time_taken': end_time - start_time if end_time and start_time else None
+        })
+
+    question_analysis = [{
+        'question_text': question_text,
+        'correct_count': question_correct[question_id],
+        'incorrect_count': question_answered[question_id] - question_correct[question_id]
+    } for question_id, question_text in all_questions]
+
+    average_score = sum(s['score'] for s in submissions if s['score'] is not None) / len(submissions) if submissions else 0
+
+    return {
+        'submissions': submissions,
+        'question_analysis': question_analysis,
+        'average_score': average_score
+    }
@@ -0,0 +1,80 @@
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from .models import db, StudentAnswer
+from .exam_paper import get_exam_paper, invalidate_exam_paper
+
+MAX_ANSWERS_PER_BATCH = 500
+
+def parse_answer_batch(items):
+    """Validates a list of {question_id, answer_text} dicts.
+
+    Returns a question_id -> answer_text dict in which a later entry for the same
+    question wins, or raises ValueError for malformed input.
+    """
+    if not isinstance(items, list):
+        raise ValueError('answers must be a list')
+    if len(items) > MAX_ANSWERS_PER_BATCH:
+        raise ValueError(f'at most {MAX_ANSWERS_PER_BATCH} answers may be saved at once')
+
+    answers = {}
+    for item in items:
+        if not isinstance(item, dict) or 'question_id' not in item:
+            raise ValueError('each answer needs a question_id')
+        try:
+            question_id = int(item['question_id'])
+        except (TypeError, ValueError):
+            raise ValueError('question_id must be an integer')
+        answer_text = item.get('answer_text')
+        answers[question_id] = None if answer_text is None else str(answer_text)
+    return answers
+
+def save_answers(submission_id, answers):
+    """Upserts a question_id -> answer_text dict for one submission in a single statement.
+
+    Relies on the unique (submission_id, question_id) constraint. Rows are sent in
+    question order so that overlapping concurrent batches lock in the same order.
+    Committing is left to the caller.
+    """
+    if not answers:
+        return 0
+
+    stmt = insert(StudentAnswer).values([
+        {'submission_id': submission_id, 'question_id': question_id, 'answer_text': answers[question_id]}
+        for question_id in sorted(answers)
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[StudentAnswer.submission_id, StudentAnswer.question_id],
+        set_={'answer_text': stmt.excluded.answer_text}
+    )
+    db.session.execute(stmt)
+    return len(answers)
+
+def save_exam_answers(submission_id, exam_id, answers):
+    """Saves answers to an attempt, ignoring question ids that are not part of its exam.
+
+    Unknown ids, e.g. a question the teacher deleted mid-exam, are dropped instead of
+    failing the whole batch. This worker's cached paper can be stale either way: it
+    misses a question added through another worker, or still lists a deleted one and
+    the insert hits the foreign key. Both rebuild the paper once before anything is
+    dropped. Returns (saved count, ignored question ids). Committing is left to the
+    caller.
+    """
+    refreshed = False
+    while True:
+        paper = get_exam_paper(exam_id)
+        question_ids = paper.question_ids if paper is not None else frozenset()
+        if not refreshed and not question_ids.issuperset(answers):
+            invalidate_exam_paper(exam_id)
+            refreshed = True
+            continue
+        known = {question_id: text for question_id, text in answers.items() if question_id in question_ids}
+        try:
+            saved = save_answers(submission_id, known)
+        except IntegrityError:
+            db.session.rollback()
+            if refreshed:
+                raise
+            invalidate_exam_paper(exam_id)
+            refreshed = True
+            continue
+        return saved, sorted(set(answers) - set(known))
@@ -0,0 +1,15 @@
+from importlib import import_module
+
+# Blueprint name -> module; each module defines `bp`. Imported on demand so that an
+# application built with some blueprints never imports the others.
+BLUEPRINTS = {
+    'auth': '.auth',
+    'student': '.student',
+    'teacher': '.teacher',
+    'admin': '.admin',
+    'export': '.export',
+    'jobs': '.jobs',
+}
+
+def load_blueprint(name):
+    return import_module(BLUEPRINTS[name], __name__).bp
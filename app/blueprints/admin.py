@@ -0,0 +1,138 @@
+import secrets
+from datetime import datetime, timedelta
+from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask_login import login_required, current_user
+from ..models import db, User, Exam, ExamSubmission, PasswordResetToken
+from ..identity import invalidate_user
+from ..sessions import revoke_user_sessions
+from ..jobs import enqueue, save_job_file
+from ..helpers import send_email
+
+bp = Blueprint('admin', __name__)
+
+@bp.route('/admin/dashboard')
+@login_required
+def admin_dashboard():
+    pending_teachers = User.query.filter_by(role='teacher', status='pending').all()
+    return render_template('admin_dashboard.html', pending_teachers=pending_teachers)
+
+@bp.route('/admin/teacher/approve/<int:teacher_id>')
+@login_required
+def approve_teacher(teacher_id):
+    teacher = User.query.get(teacher_id)
+    if teacher and teacher.role == 'teacher':
+        teacher.status = 'approved'
+        db.session.commit()
+        invalidate_user(teacher.id)
+        flash('Teacher approved.')
+    else:
+        flash('Teacher not found.')
+    return redirect(url_for('admin.admin_dashboard'))
+
+@bp.route('/admin/teacher/decline/<int:teacher_id>')
+@login_required
+def decline_teacher(teacher_id):
+    teacher = User.query.get(teacher_id)
+    if teacher and teacher.role == 'teacher':
+        db.session.delete(teacher)
+        db.session.commit()
+        invalidate_user(teacher_id)
+        revoke_user_sessions(teacher_id)
+        flash('Teacher declined.')
+    else:
+        flash('Teacher not found.')
+    return redirect(url_for('admin.admin_dashboard'))
+
+@bp.route('/admin/users')
+@login_required
+def manage_users():
+    users = User.query.all()
+    return render_template('manage_users.html', users=users)
+
+@bp.route('/admin/analytics')
+@login_required
+def admin_analytics():
+    total_users = User.query.count()
+    total_teachers = User.query.filter_by(role='teacher').count()
+    total_students = User.query.filter_by(role='student').count()
+    total_exams = Exam.query.count()
+    total_submissions = ExamSubmission.query.count()
+    average_score = db.session.query(db.func.avg(ExamSubmission.score)).scalar() or 0
+
+    stats = {
+        'total_users': total_users,
+        'total_teachers': total_teachers,
+        'total_students': total_students,
+        'total_exams': total_exams,
+        'total_submissions': total_submissions,
+        'average_score': average_score
+    }
+    return render_template('admin_analytics.html', stats=stats)
+
+@bp.route('/admin/users/bulk_import', methods=['POST'])
+@login_required
+def bulk_import_users():
+    file = request.files['file']
+    if not file:
+        flash('No file selected for upload.')
+        return redirect(url_for('admin.manage_users'))
+
+    if not file.filename.endswith('.xlsx'):
+        flash('Invalid file format. Please upload an Excel file (.xlsx).')
+        return redirect(url_for('admin.manage_users'))
+
+    job = enqueue('import_users', save_job_file(file), user_id=current_user.id)
+    db.session.commit()
+    flash(f'{file.filename} is being imported in the background.')
+    return redirect(url_for('jobs.job_list', highlight=job.id))
+
+@bp.route('/admin/user/edit/<int:user_id>', methods=['GET', 'POST'])
+@login_required
+def edit_user(user_id):
+    user = User.query.get_or_404(user_id)
+    if request.method == 'POST':
+        user.fullname = request.form['fullname']
+        user.email = request.form['email']
+        user.role = request.form['role']
+        db.session.commit()
+        invalidate_user(user.id)
+        flash('User updated successfully.')
+        return redirect(url_for('admin.manage_users'))
+
+    return render_template('edit_user.html', user=user)
+
+@bp.route('/admin/user/reset_password/<int:user_id>')
+@login_required
+def admin_reset_password(user_id):
+    user = User.query.get(user_id)
+    if user:
+        token = secrets.token_urlsafe(16)
+        expires_at = datetime.utcnow() + timedelta(hours=1)
+        new_token = PasswordResetToken(user_id=user.id, token=token, expires_at=expires_at)
+        db.session.add(new_token)
+        db.session.commit()
+
+        reset_link = url_for('auth.reset_password', token=token, _external=True)
+        send_email(
+            subject='Password Reset Initiated by Admin',
+            recipients=[user.email],
+            body=f'An admin has initiated a password reset for your account. Click the following link to reset your password: {reset_link}'
+        )
+        flash(f"A password reset link has been sent to {user.email}.")
+    else:
+        flash('User not found.')
+    return redirect(url_for('admin.manage_users'))
+
+@bp.route('/admin/user/delete/<int:user_id>')
+@login_required
+def delete_user(user_id):
+    user = User.query.get(user_id)
+    if user:
+        db.session.delete(user)
+        db.session.commit()
+        invalidate_user(user_id)
+        revoke_user_sessions(user_id)
+        flash('User deleted successfully.')
+    else:
+        flash('User not found.')
+    return redirect(url_for('admin.manage_users'))
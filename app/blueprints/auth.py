@@ -0,0 +1,292 @@
+import os
+import secrets
+from datetime import datetime, timedelta
+from flask import Blueprint, current_app, render_template, request, redirect, url_for, flash, session
+from flask_login import login_user, logout_user, login_required, current_user
+from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.utils import secure_filename
+from ..models import db, User, PasswordResetToken
+from ..identity import invalidate_user
+from ..helpers import send_email
+
+bp = Blueprint('auth', __name__)
+
+@bp.route('/')
+def index():
+    return render_template('index.html')
+
+@bp.route('/teacher/login', methods=['GET', 'POST'])
+def teacher_login():
+    if request.method == 'POST':
+        email = request.form['email']
+        password = request.form['password']
+        user = User.query.filter_by(email=email, role='teacher', status='approved').first()
+
+        if user and check_password_hash(user.password_hash, password):
+            login_user(user)
+            return redirect(url_for('teacher.teacher_dashboard'))
+        else:
+            flash('Invalid email or password, or account not approved.')
+
+    return render_template('teacher_login.html')
+
+@bp.route('/teacher/register', methods=['GET', 'POST'])
+def teacher_register():
+    if request.method == 'POST':
+        fullname = request.form['fullname']
+        email = request.form['email']
+        password = request.form['password']
+        gender = request.form['gender']
+
+        if User.query.filter_by(email=email).first():
+            flash('Email already registered.')
+        else:
+            password_hash = generate_password_hash(password)
+            new_teacher = User(
+                fullname=fullname,
+                email=email,
+                password_hash=password_hash,
+                role='teacher',
+                gender=gender,
+                status='pending'
+            )
+            db.session.add(new_teacher)
+            db.session.commit()
+            flash('Registration successful. Please wait for admin approval.')
+            return redirect(url_for('auth.teacher_login'))
+
+    return render_template('teacher_register.html')
+
+@bp.route('/student/login', methods=['GET', 'POST'])
+def student_login():
+    if request.method == 'POST':
+        email = request.form['email']
+        password = request.form['password']
+        user = User.query.filter_by(email=email, role='student').first()
+
+        if user and check_password_hash(user.password_hash, password):
+            login_user(user)
+            return redirect(url_for('student.student_dashboard'))
+        else:
+            flash('Invalid email or password.')
+
+    return render_template('student_login.html')
+
+@bp.route('/student/register', methods=['GET', 'POST'])
+def student_register():
+    if request.method == 'POST':
+        fullname = request.form['fullname']
+        email = request.form['email']
+        password = request.form['password']
+        gender = request.form['gender']
+        student_class = request.form['class_']
+
+        if User.query.filter_by(email=email).first():
+            flash('Email already registered.')
+        else:
+            password_hash = generate_password_hash(password)
+            new_student = User(
+                fullname=fullname,
+                email=email,
+                password_hash=password_hash,
+                role='student',
+                gender=gender,
+                class_=student_class
+            )
+            db.session.add(new_student)
+            db.session.commit()
+            flash('Registration successful. Please login.')
+            return redirect(url_for('auth.student_login'))
+
+    return render_template('student_register.html')
+
+@bp.route('/logout')
+def logout():
+    logout_user()
+    return redirect(url_for('auth.index'))
+
+@bp.route('/admin/register', methods=['GET', 'POST'])
+def admin_register():
+    if User.query.filter_by(role='admin').first():
+        flash('An admin account already exists.')
+        return redirect(url_for('auth.admin_login'))
+
+    if request.method == 'POST':
+        fullname = request.form['fullname']
+        email = request.form['email']
+        password = request.form['password']
+        password_hash = generate_password_hash(password)
+
+        new_admin = User(
+            fullname=fullname,
+            email=email,
+            password_hash=password_hash,
+            role='admin',
+            status='approved'
+        )
+        db.session.add(new_admin)
+        db.session.commit()
+        flash('Admin registration successful. Please login.')
+        return redirect(url_for('auth.admin_login'))
+
+    return render_template('admin_register.html')
+
+@bp.route('/admin/login', methods=['GET', 'POST'])
+def admin_login():
+    if request.method == 'POST':
+        email = request.form['email']
+        password = request.form['password']
+        user = User.query.filter_by(email=email, role='admin').first()
+
+        if user and check_password_hash(user.password_hash, password):
+            login_user(user)
+            return redirect(url_for('admin.admin_dashboard'))
+        else:
+            flash('Invalid email or password.')
+
+    return render_template('admin_login.html')
+
+@bp.route('/profile', methods=['GET', 'POST'])
+@login_required
+def profile():
+    if request.method == 'POST':
+        user = User.query.get(current_user.id)
+        user.fullname = request.form['fullname']
+        user.email = request.form['email']
+
+        if 'profile_image' in request.files:
+            file = request.files['profile_image']
+            if file and file.filename != '':
+                # Create a secure, unique filename
+                filename = secure_filename(f"{current_user.id}_{file.filename}")
+
+                # Ensure the 'profiles' subdirectory exists
+                profiles_folder = os.path.join(current_app.config['UPLOAD_FOLDER'], 'profiles')
+                os.makedirs(profiles_folder, exist_ok=True)
+
+                filepath = os.path.join(profiles_folder, filename)
+                file.save(filepath)
+                user.profile_image = filename
+
+        db.session.commit()
+        invalidate_user(user.id)
+        flash('Profile updated successfully.')
+        return redirect(url_for('auth.profile'))
+
+    return render_template('profile.html')
+
+@bp.route('/forgot_password', methods=['GET', 'POST'])
+def forgot_password():
+    if request.method == 'POST':
+        email = request.form['email']
+        user = User.query.filter_by(email=email).first()
+
+        if user:
+            token = secrets.token_urlsafe(16)
+            expires_at = datetime.utcnow() + timedelta(hours=1)
+            new_token = PasswordResetToken(user_id=user.id, token=token, expires_at=expires_at)
+            db.session.add(new_token)
+            db.session.commit()
+
+            reset_link = url_for('auth.reset_password', token=token, _external=True)
+            send_email(
+                subject='Password Reset Request',
+                recipients=[user.email],
+                body=f'Click the following link to reset your password: {reset_link}'
+            )
+            flash('A password reset link has been sent to your email.')
+        else:
+            flash('Email address not found.')
+        return redirect(url_for('auth.forgot_password'))
+
+    return render_template('forgot_password.html')
+
+@bp.route('/reset_password/<token>', methods=['GET', 'POST'])
+def reset_password(token):
+    token_data = PasswordResetToken.query.filter(PasswordResetToken.token == token, PasswordResetToken.expires_at > datetime.utcnow()).first()
+
+    if not token_data:
+        flash('Invalid or expired password reset link.')
+        return redirect(url_for('auth.forgot_password'))
+
+    if request.method == 'POST':
+        password = request.form['password']
+        confirm_password = request.form['confirm_password']
+
+        if password != confirm_password:
+            flash('Passwords do not match.')
+            return render_template('reset_password.html', token=token)
+
+        user = User.query.get(token_data.user_id)
+        user.password_hash = generate_password_hash(password)
+        db.session.delete(token_data)
+        db.session.commit()
+        invalidate_user(user.id)
+
+        flash('Your password has been reset successfully.')
+        return redirect(url_for('auth.student_login'))
+
+    return render_template('reset_password.html', token=token)
+
+def get_google_flow():
+    """Initializes and returns the Google OAuth Flow object."""
+    # The Google client libraries are only needed for OAuth logins, so they are not imported at startup.
+    from google_auth_oauthlib.flow import Flow
+    client_secrets_file = os.path.join(current_app.root_path, 'client_secret.json')
+    return Flow.from_client_secrets_file(
+        client_secrets_file,
+        scopes=['https://www.googleapis.com/auth/userinfo.profile', 'https://www.googleapis.com/auth/userinfo.email', 'openid'],
+        redirect_uri=url_for('auth.google_callback', _external=True)
+    )
+
+@bp.route('/google/login')
+def google_login():
+    try:
+        flow = get_google_flow()
+        authorization_url, state = flow.authorization_url()
+        session['state'] = state
+        return redirect(authorization_url)
+    except FileNotFoundError:
+        flash("Google OAuth is not configured. Please add client_secret.json.")
+        return redirect(url_for('auth.student_login'))
+
+@bp.route('/google/callback')
+def google_callback():
+    import requests
+    from cachecontrol import CacheControl
+    from google.auth.transport import requests as google_requests
+    from google.oauth2 import id_token
+
+    flow = get_google_flow()
+    flow.fetch_token(authorization_response=request.url)
+
+    credentials = flow.credentials
+    request_session = requests.session()
+    cached_session = CacheControl(request_session)
+    token_request = google_requests.Request(session=cached_session)
+
+    id_info = id_token.verify_oauth2_token(
+        id_token=credentials._id_token,
+        request=token_request,
+        audience=current_app.config['GOOGLE_CLIENT_ID']
+    )
+
+    email = id_info.get('email')
+    name = id_info.get('name')
+
+    user = User.query.filter_by(email=email).first()
+
+    if not user:
+        password_hash = generate_password_hash(secrets.token_hex(16))
+        user = User(
+            fullname=name,
+            email=email,
+            password_hash=password_hash,
+            role='student',
+            status='approved'
+        )
+        db.session.add(user)
+        db.session.commit()
+
+    login_user(user)
+    return redirect(url_for('student.student_dashboard'))
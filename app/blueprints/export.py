@@ -0,0 +1,37 @@
+from flask import Blueprint, Response, redirect, url_for, flash, send_file, stream_with_context
+from flask_login import login_required, current_user
+from ..models import Exam
+from ..exports import RESULT_COLUMNS, USER_COLUMNS, XLSX_MIMETYPE, iter_result_rows, iter_user_rows, stream_csv, write_xlsx
+from ..reports import get_results_report
+
+bp = Blueprint('export', __name__)
+
+@bp.route('/teacher/exam/<int:exam_id>/export/<format>')
+@login_required
+def export_results(exam_id, format):
+    exam = Exam.query.filter_by(id=exam_id, teacher_id=current_user.id).first()
+    if not exam:
+        flash('Exam not found.')
+        return redirect(url_for('teacher.teacher_dashboard'))
+
+    if format == 'csv':
+        return Response(stream_with_context(stream_csv(RESULT_COLUMNS, iter_result_rows(exam_id))), 200, {
+            'Content-Disposition': f'attachment; filename=results_{exam_id}.csv',
+            'Content-Type': 'text/csv'
+        })
+
+    elif format == 'xlsx':
+        output = write_xlsx(RESULT_COLUMNS, iter_result_rows(exam_id), 'Results')
+        return send_file(output, mimetype=XLSX_MIMETYPE, as_attachment=True, download_name=f'results_{exam_id}.xlsx')
+
+    elif format == 'pdf':
+        return send_file(get_results_report(exam), mimetype='application/pdf', as_attachment=True,
+                         download_name=f'results_{exam_id}.pdf')
+
+    return redirect(url_for('teacher.teacher_analytics', exam_id=exam_id))
+
+@bp.route('/admin/users/export')
+@login_required
+def export_users():
+    output = write_xlsx(USER_COLUMNS, iter_user_rows(), 'Users')
+    return send_file(output, mimetype=XLSX_MIMETYPE, as_attachment=True, download_name='all_users.xlsx')
@@ -0,0 +1,25 @@
+from flask import Blueprint, render_template, request, jsonify
+from flask_login import login_required, current_user
+from ..models import db, Job, OutboxEmail
+from ..jobs import job_as_dict
+
+bp = Blueprint('jobs', __name__)
+
+@bp.route('/jobs')
+@login_required
+def job_list():
+    query = Job.query if current_user.role == 'admin' else Job.query.filter_by(user_id=current_user.id)
+    jobs = query.order_by(Job.id.desc()).limit(50).all()
+    outbox = None
+    if current_user.role == 'admin':
+        outbox = dict(db.session.query(OutboxEmail.status, db.func.count(OutboxEmail.id))
+                      .group_by(OutboxEmail.status).all())
+    return render_template('jobs.html', jobs=jobs, outbox=outbox, highlight=request.args.get('highlight', type=int))
+
+@bp.route('/jobs/<int:job_id>')
+@login_required
+def job_status(job_id):
+    job = Job.query.get_or_404(job_id)
+    if current_user.role != 'admin' and job.user_id != current_user.id:
+        return jsonify({'error': 'Job not found.'}), 404
+    return jsonify(job_as_dict(job))
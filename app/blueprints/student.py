@@ -0,0 +1,198 @@
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, abort
+from flask_login import login_required, current_user
+from sqlalchemy import or_
+from ..models import db, Exam, Question, ExamSubmission, StudentAnswer
+from ..grading import get_answer_key
+from ..exam_paper import get_exam_paper, new_shuffle_seed
+from ..exam_timer import submission_deadline, is_expired, finalize_submissions
+from ..answers import parse_answer_batch, save_exam_answers
+from ..helpers import get_wat_now
+
+bp = Blueprint('student', __name__)
+
+def closed_submission_response(submission):
+    """Returns an error response if answers can no longer be saved to an attempt, otherwise None."""
+    if submission.status != 'in-progress':
+        return jsonify({'status': 'error', 'message': 'Exam already submitted'}), 409
+    paper = get_exam_paper(submission.exam_id)
+    if paper is None or is_expired(submission.start_time, paper.duration, paper.end_time):
+        return jsonify({'status': 'error', 'message': 'Time is up for this exam'}), 409
+    return None
+
+@bp.route('/student/exam/submit', methods=['POST'])
+@login_required
+def submit_exam_route():
+    data = request.json
+    submission_id = data['submission_id']
+
+    # Lock the row so that a double submit cannot be counted twice in the exam stats.
+    submission = ExamSubmission.query.filter_by(id=submission_id, student_id=current_user.id).with_for_update().first()
+    if submission:
+        if submission.status != 'submitted':
+            # A late submit is recorded as ending at the deadline, not when the browser sent it.
+            end_time = get_wat_now()
+            paper = get_exam_paper(submission.exam_id)
+            if paper is not None:
+                end_time = min(end_time, submission_deadline(submission.start_time, paper.duration, paper.end_time))
+            finalize_submissions([submission], {submission.id: end_time})
+        db.session.commit()
+        flash('Exam submitted successfully!')
+        return jsonify({'status': 'success'})
+
+    return jsonify({'status': 'error', 'message': 'Submission not found'}), 404
+
+@bp.route('/student/results/<int:submission_id>')
+@login_required
+def view_results(submission_id):
+    submission = ExamSubmission.query.filter_by(id=submission_id, student_id=current_user.id).first_or_404()
+    exam = submission.exam
+    all_questions = exam.questions
+    total_questions = len(all_questions)
+
+    answers_query = db.session.query(
+        Question,
+        StudentAnswer.answer_text
+    ).outerjoin(StudentAnswer, (StudentAnswer.question_id == Question.id) & (StudentAnswer.submission_id == submission_id))\
+    .filter(Question.exam_id == exam.id).all()
+
+    answer_key = get_answer_key(exam.id)
+    results = []
+    answered_questions = 0
+    correct_answers = 0
+
+    for question, answer_text in answers_query:
+        is_correct = False
+        if answer_text is not None:
+            answered_questions += 1
+            is_correct = answer_key.is_correct(question.id, answer_text)
+
+        if is_correct:
+            correct_answers += 1
+
+        results.append({
+            'question': question,
+            'student_answer': {'answer_text': answer_text},
+            'is_correct': is_correct
+        })
+
+    incorrect_answers = answered_questions - correct_answers
+    time_taken = submission.end_time - submission.start_time if submission.end_time and submission.start_time else None
+
+    return render_template('view_results.html', exam=exam, submission=submission, results=results,
+                           total_questions=total_questions, answered_questions=answered_questions,
+                           correct_answers=correct_answers, incorrect_answers=incorrect_answers,
+                           time_taken=time_taken)
+
+@bp.route('/student/exam/<int:exam_id>/instructions')
+@login_required
+def exam_instructions(exam_id):
+    exam = Exam.query.get_or_404(exam_id)
+    return render_template('exam_instructions.html', exam=exam)
+
+@bp.route('/student/dashboard')
+@login_required
+def student_dashboard():
+    now = get_wat_now()
+
+    submitted_exam_ids = db.select(ExamSubmission.exam_id).where(ExamSubmission.student_id == current_user.id)
+
+    available_exams = Exam.query.filter(
+        Exam.id.notin_(submitted_exam_ids),
+        or_(
+            # Case 1: Exam is currently active within a defined time window
+            (Exam.start_time != None) & (Exam.end_time != None) & (Exam.start_time <= now) & (Exam.end_time >= now),
+            # Case 2: Exam has no start or end time, making it always available
+            (Exam.start_time == None) & (Exam.end_time == None)
+        )
+    ).all()
+
+    upcoming_exams = Exam.query.filter(Exam.start_time > now).all()
+
+    completed_exams = db.session.query(
+        Exam.id, Exam.title, Exam.class_, ExamSubmission.id.label('submission_id'), ExamSubmission.score, Exam.delay_results
+    ).join(ExamSubmission).filter(
+        ExamSubmission.student_id == current_user.id,
+        ExamSubmission.status == 'submitted'
+    ).all()
+
+    return render_template('student_dashboard.html', available_exams=available_exams, upcoming_exams=upcoming_exams, completed_exams=completed_exams, now=now)
+
+@bp.route('/student/exam/start/<int:exam_id>')
+@login_required
+def start_exam(exam_id):
+    paper = get_exam_paper(exam_id)
+    if paper is None:
+        abort(404)
+
+    submission = ExamSubmission.query.filter_by(student_id=current_user.id, exam_id=exam_id).first()
+    if not submission:
+        if paper.end_time is not None and get_wat_now() >= paper.end_time:
+            flash('This exam has ended.')
+            return redirect(url_for('student.student_dashboard'))
+        submission = ExamSubmission(student_id=current_user.id, exam_id=exam_id, start_time=get_wat_now(),
+                                    shuffle_seed=new_shuffle_seed())
+        db.session.add(submission)
+        db.session.commit()
+    elif submission.status == 'submitted':
+        flash('You have already submitted this exam.')
+        return redirect(url_for('student.student_dashboard'))
+    elif is_expired(submission.start_time, paper.duration, paper.end_time):
+        db.session.refresh(submission, with_for_update=True)
+        if submission.status != 'submitted':
+            deadline = submission_deadline(submission.start_time, paper.duration, paper.end_time)
+            finalize_submissions([submission], {submission.id: deadline})
+        db.session.commit()
+        flash('Your time for this exam ran out, so your saved answers have been submitted.')
+        return redirect(url_for('student.student_dashboard'))
+    elif submission.shuffle_seed is None:
+        submission.shuffle_seed = new_shuffle_seed()
+        db.session.commit()
+
+    deadline = submission_deadline(submission.start_time, paper.duration, paper.end_time)
+    seconds_left = max(0, int((deadline - get_wat_now()).total_seconds()))
+    questions = [{'id': question_id, 'html': html}
+                 for question_id, html in paper.ordered_questions(submission.shuffle_seed)]
+    return render_template('take_exam.html', exam=paper, questions=questions, submission_id=submission.id,
+                           seconds_left=seconds_left)
+
+@bp.route('/student/exam/save_answer', methods=['POST'])
+@login_required
+def save_answer():
+    data = request.json
+    submission = ExamSubmission.query.filter_by(id=data['submission_id'], student_id=current_user.id).first()
+    if not submission:
+        return jsonify({'status': 'error', 'message': 'Submission not found'}), 404
+    closed = closed_submission_response(submission)
+    if closed:
+        return closed
+
+    try:
+        question_id = int(data['question_id'])
+    except (KeyError, TypeError, ValueError):
+        return jsonify({'status': 'error', 'message': 'question_id must be an integer'}), 400
+
+    saved, ignored = save_exam_answers(submission.id, submission.exam_id, {question_id: data.get('answer_text')})
+    db.session.commit()
+    if ignored:
+        return jsonify({'status': 'error', 'message': 'Question is not part of this exam'}), 404
+    return jsonify({'status': 'success'})
+
+@bp.route('/student/exam/save_answers', methods=['POST'])
+@login_required
+def save_answers_batch():
+    data = request.get_json(silent=True) or {}
+    submission = ExamSubmission.query.filter_by(id=data.get('submission_id'), student_id=current_user.id).first()
+    if not submission:
+        return jsonify({'status': 'error', 'message': 'Submission not found'}), 404
+    closed = closed_submission_response(submission)
+    if closed:
+        return closed
+
+    try:
+        answers = parse_answer_batch(data.get('answers'))
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+
+    saved, ignored = save_exam_answers(submission.id, submission.exam_id, answers)
+    db.session.commit()
+    return jsonify({'status': 'success', 'saved': saved, 'ignored': ignored})
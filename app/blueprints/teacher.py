@@ -0,0 +1,401 @@
+import os
+import json
+from datetime import datetime
+import pytz
+from flask import Blueprint, current_app, render_template, request, redirect, url_for, flash, jsonify
+from flask_login import login_required, current_user
+from werkzeug.utils import secure_filename
+from ..models import db, User, Exam, Question, ExamSubmission, ExamStats, QuestionImport
+from ..invalidation import questions_changed
+from ..stats import rebuild_exam_stats
+from ..exam_paper import invalidate_exam_paper
+from ..analytics import get_exam_analytics
+from ..jobs import enqueue, save_job_file
+from ..helpers import get_wat_now, get_class_sizes
+
+bp = Blueprint('teacher', __name__)
+
+@bp.route('/teacher/documentation')
+@login_required
+def teacher_documentation():
+    return render_template('teacher_documentation.html')
+
+@bp.route('/teacher/dashboard')
+@login_required
+def teacher_dashboard():
+    now = get_wat_now()
+
+    exams_data = db.session.query(
+        Exam,
+        db.func.coalesce(ExamStats.submission_count, 0).label('submission_count')
+    ).outerjoin(ExamStats, Exam.id == ExamStats.exam_id)\
+    .filter(Exam.teacher_id == current_user.id)\
+    .order_by(Exam.created_at.desc())\
+    .all()
+
+    teacher_classes = sorted({exam.class_ for exam, _ in exams_data if exam.class_})
+    class_sizes = get_class_sizes(teacher_classes)
+
+    exams = []
+    for exam, submission_count in exams_data:
+        is_active = False
+        if exam.start_time:
+            if exam.end_time:
+                is_active = exam.start_time <= now <= exam.end_time
+            else:
+                is_active = exam.start_time <= now
+
+        total_students_in_class = class_sizes.get(exam.class_, 0)
+        completion_rate = (submission_count / total_students_in_class) * 100 if total_students_in_class > 0 else 0
+
+        exams.append({
+            'id': exam.id,
+            'title': exam.title,
+            'class': exam.class_,
+            'duration': exam.duration,
+            'start_time': exam.start_time,
+            'end_time': exam.end_time,
+            'delay_results': exam.delay_results,
+            'submission_count': submission_count,
+            'is_active': is_active,
+            'completion_rate': completion_rate
+        })
+
+    # --- DYNAMIC ACTIVITY FEED LOGIC ---
+    activities = []
+    wat_tz = pytz.timezone('Africa/Lagos')
+
+    # 1. Recent exam creations (exams_data is already ordered newest first)
+    for exam, _ in exams_data[:5]:
+        # Ensure datetime is timezone-aware before appending
+        aware_time = exam.created_at.astimezone(wat_tz) if exam.created_at.tzinfo else wat_tz.localize(exam.created_at)
+        activities.append({
+            'type': 'exam_created',
+            'title': f"New exam created: {exam.title}",
+            'time': aware_time,
+            'icon': '📝'
+        })
+
+    # 2. Fetch recent student submissions for this teacher's exams
+    recent_submissions = db.session.query(
+        User.fullname,
+        Exam.title,
+        ExamSubmission.end_time
+    ).join(User, ExamSubmission.student_id == User.id)\
+    .join(Exam, ExamSubmission.exam_id == Exam.id)\
+    .filter(Exam.teacher_id == current_user.id, ExamSubmission.status == 'submitted')\
+    .order_by(ExamSubmission.end_time.desc())\
+    .limit(5).all()
+
+    for fullname, title, end_time in recent_submissions:
+        if end_time:
+            # Ensure datetime is timezone-aware before appending
+            aware_time = end_time.astimezone(wat_tz) if end_time.tzinfo else wat_tz.localize(end_time)
+            activities.append({
+                'type': 'submission',
+                'title': f"{fullname} completed the exam: {title}",
+                'time': aware_time,
+                'icon': '📊'
+            })
+
+    # 3. Fetch new student registrations in the teacher's classes.
+    if teacher_classes:
+        new_students = User.query.filter(User.role == 'student', User.class_.in_(teacher_classes)).order_by(User.created_at.desc()).limit(5).all()
+        for student in new_students:
+            # Ensure datetime is timezone-aware before appending
+            aware_time = student.created_at.astimezone(wat_tz) if student.created_at.tzinfo else wat_tz.localize(student.created_at)
+            activities.append({
+                'type': 'new_student',
+                'title': f"New student registered: {student.fullname}",
+                'time': aware_time,
+                'icon': '👤'
+            })
+
+    # Sort all activities by time (now that they are all timezone-aware)
+    activities.sort(key=lambda x: x['time'], reverse=True)
+    recent_activities = activities[:5]
+    # --- END ACTIVITY FEED LOGIC ---
+
+    return render_template('teacher_dashboard.html', exams=exams, activities=recent_activities)
+
+@bp.route('/teacher/exam/create', methods=['GET', 'POST'])
+@login_required
+def create_exam():
+    if request.method == 'POST':
+        title = request.form['title']
+        exam_class = request.form['class_']
+        duration = request.form['duration']
+        description = request.form['description']
+        start_time_str = request.form.get('start_time') or None
+        end_time_str = request.form.get('end_time') or None
+        randomize_questions = 'randomize_questions' in request.form
+        randomize_options = 'randomize_options' in request.form
+        delay_results = 'delay_results' in request.form
+
+        wat_tz = pytz.timezone('Africa/Lagos')
+        date_format = '%Y-%m-%dT%H:%M'
+        start_time = wat_tz.localize(datetime.strptime(start_time_str, date_format)) if start_time_str else None
+        end_time = wat_tz.localize(datetime.strptime(end_time_str, date_format)) if end_time_str else None
+
+        new_exam = Exam(
+            title=title,
+            class_=exam_class,
+            duration=duration,
+            description=description,
+            teacher_id=current_user.id,
+            start_time=start_time,
+            end_time=end_time,
+            randomize_questions=randomize_questions,
+            randomize_options=randomize_options,
+            delay_results=delay_results
+        )
+        db.session.add(new_exam)
+        db.session.commit()
+
+        flash('Exam created successfully. Now add questions.')
+        return redirect(url_for('teacher.manage_exam', exam_id=new_exam.id))
+
+    now_wat = get_wat_now().strftime('%Y-%m-%d %H:%M:%S')
+    return render_template('create_exam.html', current_time=now_wat)
+
+@bp.route('/teacher/exam/edit/<int:exam_id>', methods=['GET', 'POST'])
+@login_required
+def edit_exam(exam_id):
+    exam = Exam.query.filter_by(id=exam_id, teacher_id=current_user.id).first_or_404()
+
+    if request.method == 'POST':
+        exam.title = request.form['title']
+        exam.class_ = request.form['class_']
+        exam.duration = request.form['duration']
+        exam.description = request.form['description']
+        start_time_str = request.form.get('start_time')
+        end_time_str = request.form.get('end_time')
+
+        wat_tz = pytz.timezone('Africa/Lagos')
+        date_format = '%Y-%m-%dT%H:%M'
+        if start_time_str:
+            exam.start_time = wat_tz.localize(datetime.strptime(start_time_str, date_format))
+        else:
+            exam.start_time = None
+
+        if end_time_str:
+            exam.end_time = wat_tz.localize(datetime.strptime(end_time_str, date_format))
+        else:
+            exam.end_time = None
+
+        exam.randomize_questions = 'randomize_questions' in request.form
+        exam.randomize_options = 'randomize_options' in request.form
+        exam.delay_results = 'delay_results' in request.form
+
+        db.session.commit()
+        invalidate_exam_paper(exam_id)
+        flash('Exam updated successfully.')
+        return redirect(url_for('teacher.teacher_dashboard'))
+
+    return render_template('edit_exam.html', exam=exam)
+
+@bp.route('/teacher/exam/<int:exam_id>/manage')
+@login_required
+def manage_exam(exam_id):
+    exam = Exam.query.filter_by(id=exam_id, teacher_id=current_user.id).first_or_404()
+    questions = Question.query.filter_by(exam_id=exam_id).order_by(Question.id).all()
+    imports = QuestionImport.query.filter_by(exam_id=exam_id).order_by(QuestionImport.id.desc()).limit(5).all()
+    return render_template('manage_exam.html', exam=exam, questions=questions, imports=imports)
+
+@bp.route('/teacher/exam/<int:exam_id>/add_question', methods=['GET', 'POST'])
+@login_required
+def add_question(exam_id):
+    if request.method == 'POST':
+        question_text = request.form['question_text']
+        question_type = request.form['question_type']
+
+        options = None
+        correct_answer = ''
+        question_image = None
+
+        if 'question_image' in request.files:
+            file = request.files['question_image']
+            if file.filename != '':
+                filename = secure_filename(file.filename)
+                filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
+                file.save(filepath)
+                question_image = filename
+
+        if question_type in ['single-choice', 'multiple-choice']:
+            form_options = [request.form[key] for key in request.form if key.startswith('option_')]
+            correct_indices = request.form.getlist('correct_option')
+
+            options_data = [{'text': text, 'correct': str(i) in correct_indices} for i, text in enumerate(form_options)]
+            options = json.dumps(options_data)
+            correct_answer = json.dumps(correct_indices)
+
+        else:
+            correct_answer = request.form['correct_answer']
+
+        new_question = Question(
+            exam_id=exam_id,
+            question_text=question_text,
+            question_image=question_image,
+            question_type=question_type,
+            options=options,
+            correct_answer=correct_answer
+        )
+        db.session.add(new_question)
+        db.session.commit()
+        questions_changed(exam_id)
+
+        flash('Question added successfully.')
+        return redirect(url_for('teacher.manage_exam', exam_id=exam_id))
+
+    exam = Exam.query.get_or_404(exam_id)
+    return render_template('add_question.html', exam=exam)
+
+@bp.route('/teacher/exam/delete/<int:exam_id>')
+@login_required
+def delete_exam(exam_id):
+    exam = Exam.query.filter_by(id=exam_id, teacher_id=current_user.id).first()
+    if exam:
+        db.session.delete(exam)
+        db.session.commit()
+        questions_changed(exam_id)
+        flash('Exam deleted.')
+    else:
+        flash('Exam not found or you do not have permission to delete it.')
+    return redirect(url_for('teacher.teacher_dashboard'))
+
+@bp.route('/teacher/exam/<int:exam_id>/release_results', methods=['POST'])
+@login_required
+def release_exam_results(exam_id):
+    exam = Exam.query.filter_by(id=exam_id, teacher_id=current_user.id).first()
+    if exam:
+        exam.delay_results = False
+        db.session.commit()
+        flash('Results released successfully.')
+    else:
+        flash('Exam not found or you do not have permission to release results.')
+    return redirect(url_for('teacher.teacher_dashboard'))
+
+@bp.route('/teacher/question/delete/<int:question_id>')
+@login_required
+def delete_question(question_id):
+    question = Question.query.get(question_id)
+    if question and question.exam.teacher_id == current_user.id:
+        exam_id = question.exam_id
+        db.session.delete(question)
+        db.session.commit()
+        questions_changed(exam_id)
+        rebuild_exam_stats([exam_id])  # its answers were deleted with it
+        db.session.commit()
+        flash('Question deleted.')
+        return redirect(url_for('teacher.manage_exam', exam_id=exam_id))
+
+    flash('Permission denied.')
+    return redirect(url_for('teacher.teacher_dashboard'))
+
+@bp.route('/teacher/exam/<int:exam_id>/upload_questions', methods=['POST'])
+@login_required
+def upload_questions(exam_id):
+    Exam.query.filter_by(id=exam_id, teacher_id=current_user.id).first_or_404()
+    file = request.files.get('file')
+    if not file or file.filename == '':
+        flash('No file selected for upload.')
+        return redirect(url_for('teacher.manage_exam', exam_id=exam_id))
+
+    if not file.filename.lower().endswith(('.csv', '.xlsx')):
+        flash('Upload failed: Please upload a .csv or .xlsx file.')
+        return redirect(url_for('teacher.manage_exam', exam_id=exam_id))
+
+    payload = save_job_file(file)
+    payload['exam_id'] = exam_id
+    enqueue('import_questions', payload, user_id=current_user.id)
+    db.session.commit()
+    flash(f'{file.filename} is being imported in the background. '
+          'Its progress appears under Recent Uploads and on the Background Jobs page.')
+    return redirect(url_for('teacher.manage_exam', exam_id=exam_id))
+
+@bp.route('/teacher/exam/<int:exam_id>/regrade', methods=['POST'])
+@login_required
+def regrade_exam(exam_id):
+    Exam.query.filter_by(id=exam_id, teacher_id=current_user.id).first_or_404()
+    enqueue('regrade_exam', {'exam_id': exam_id}, user_id=current_user.id)
+    db.session.commit()
+    flash('Regrading has been queued; scores and analytics update when it finishes.')
+    return redirect(url_for('teacher.manage_exam', exam_id=exam_id))
+
+@bp.route('/teacher/exam/<int:exam_id>/imports/<int:import_id>')
+@login_required
+def question_import_status(exam_id, import_id):
+    Exam.query.filter_by(id=exam_id, teacher_id=current_user.id).first_or_404()
+    job = QuestionImport.query.filter_by(id=import_id, exam_id=exam_id).first_or_404()
+    return jsonify({
+        'id': job.id,
+        'filename': job.filename,
+        'status': job.status,
+        'rows_processed': job.rows_processed,
+        'inserted': job.inserted,
+        'error_count': job.error_count,
+        'errors': job.errors or [],
+        'message': job.message
+    })
+
+@bp.route('/teacher/question/edit/<int:question_id>', methods=['GET', 'POST'])
+@login_required
+def edit_question(question_id):
+    question = Question.query.get_or_404(question_id)
+
+    if request.method == 'POST':
+        question.question_text = request.form['question_text']
+
+        if 'question_image' in request.files:
+            file = request.files['question_image']
+            if file.filename != '':
+                filename = secure_filename(file.filename)
+                filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
+                file.save(filepath)
+                question.question_image = filename
+
+        if question.question_type in ['single-choice', 'multiple-choice']:
+            form_options = [request.form[key] for key in sorted(request.form.keys()) if key.startswith('option_')]
+            correct_indices = request.form.getlist('correct_option')
+
+            options_data = [{'text': text, 'correct': str(i) in correct_indices} for i, text in enumerate(form_options)]
+            question.options = options_data
+            question.correct_answer = correct_indices
+        else:
+            question.correct_answer = request.form['correct_answer']
+
+        db.session.commit()
+        questions_changed(question.exam_id)
+        rebuild_exam_stats([question.exam_id])  # the correct answer may have changed
+        db.session.commit()
+        flash('Question updated successfully.')
+        return redirect(url_for('teacher.manage_exam', exam_id=question.exam_id))
+
+    return render_template('edit_question.html', question=question)
+
+@bp.route('/teacher/analytics/', defaults={'exam_id': None})
+@bp.route('/teacher/analytics/<int:exam_id>')
+@login_required
+def teacher_analytics(exam_id):
+    exam = None
+    analytics_data = {
+        'submissions': [],
+        'question_analysis': [],
+        'average_score': 0,
+        'completion_rate': 0
+    }
+
+    if exam_id:
+        exam = Exam.query.filter_by(id=exam_id, teacher_id=current_user.id).first()
+        if exam:
+            analytics_data = get_exam_analytics(exam_id)
+
+    teacher_exam_ids = [e.id for e in Exam.query.filter_by(teacher_id=current_user.id).all()]
+    total_students_with_submissions = db.session.query(db.func.count(db.distinct(ExamSubmission.student_id))).filter(ExamSubmission.exam_id.in_(teacher_exam_ids)).scalar()
+
+    teacher_classes = [c[0] for c in db.session.query(Exam.class_).filter_by(teacher_id=current_user.id).distinct().all()]
+    total_students_in_classes = sum(get_class_sizes(teacher_classes).values())
+
+    analytics_data['completion_rate'] = (total_students_with_submissions / total_students_in_classes) * 100 if total_students_in_classes > 0 else 0
+
+    return render_template('teacher_analytics.html', exam=exam, **analytics_data)
@@ -0,0 +1,99 @@
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from werkzeug.security import generate_password_hash
+from .models import db, User, ExamSubmission
+from .grading import grade_submissions
+from .stats import rebuild_exam_stats
+from .jobs import run_worker, run_worker_processes
+from .exam_timer import run_sweeper
+from .mailer import run_sender
+from .sessions import run_session_purger
+
+@click.command('create-admin')
+@click.argument('name')
+@click.argument('email')
+@click.argument('password')
+@with_appcontext
+def create_admin_command(name, email, password):
+    """Creates a new admin user."""
+    if User.query.filter_by(email=email).first():
+        print(f'Error: Admin user with email {email} already exists.')
+        return
+
+    password_hash = generate_password_hash(password)
+    new_admin = User(
+        fullname=name,
+        email=email,
+        password_hash=password_hash,
+        role='admin',
+        status='approved'
+    )
+    db.session.add(new_admin)
+    db.session.commit()
+    print(f'Admin user {name} created successfully.')
+
+@click.command('regrade-exam')
+@click.argument('exam_id', type=int)
+@with_appcontext
+def regrade_exam_command(exam_id):
+    """Recalculates the score of every submitted attempt of an exam."""
+    submissions = ExamSubmission.query.filter_by(exam_id=exam_id, status='submitted').all()
+    grade_submissions(submissions)
+    db.session.flush()
+    rebuild_exam_stats([exam_id])
+    db.session.commit()
+    print(f'Regraded {len(submissions)} submissions for exam {exam_id}.')
+
+@click.command('rebuild-stats')
+@click.option('--exam-id', type=int, multiple=True, help='Rebuild only these exams (repeatable).')
+@with_appcontext
+def rebuild_stats_command(exam_id):
+    """Recomputes exam and question statistics from the raw answers."""
+    count = rebuild_exam_stats(list(exam_id) or None)
+    db.session.commit()
+    print(f'Rebuilt statistics from {count} submissions.')
+
+@click.command('worker')
+@click.option('--processes', default=1, show_default=True, help='Number of worker processes to fork.')
+@click.option('--poll-interval', default=2.0, show_default=True, help='Seconds to wait when the queue is empty.')
+@click.option('--burst', is_flag=True, help='Exit once the queue is empty.')
+@with_appcontext
+def worker_command(processes, poll_interval, burst):
+    """Runs queued background jobs (imports and regrades)."""
+    if processes > 1:
+        run_worker_processes(current_app._get_current_object(), processes, poll_interval, burst)
+        return
+    count = run_worker(poll_interval, burst)
+    print(f'Worker stopped after running {count} jobs.')
+
+@click.command('sweep-exams')
+@click.option('--interval', default=30.0, show_default=True, help='Seconds between sweeps.')
+@click.option('--once', is_flag=True, help='Sweep once and exit.')
+@with_appcontext
+def sweep_exams_command(interval, once):
+    """Auto-submits exam attempts whose time has run out."""
+    count = run_sweeper(interval, once)
+    print(f'Sweeper stopped after submitting {count} expired attempts.')
+
+@click.command('purge-sessions')
+@click.option('--interval', default=300.0, show_default=True, help='Seconds between purges.')
+@click.option('--once', is_flag=True, help='Purge once and exit.')
+@with_appcontext
+def purge_sessions_command(interval, once):
+    """Deletes expired server-side sessions."""
+    count = run_session_purger(interval, once)
+    print(f'Purged {count} expired sessions.')
+
+@click.command('send-mail')
+@click.option('--batch-size', type=int, help='Emails per SMTP connection (default MAIL_BATCH_SIZE).')
+@click.option('--poll-interval', default=5.0, show_default=True, help='Seconds to wait when the outbox is empty.')
+@click.option('--burst', is_flag=True, help='Exit once no email is due.')
+@with_appcontext
+def send_mail_command(batch_size, poll_interval, burst):
+    """Delivers emails from the outbox."""
+    count = run_sender(poll_interval, batch_size, burst)
+    print(f'Sender stopped after delivering {count} emails.')
+
+COMMANDS = [create_admin_command, regrade_exam_command, rebuild_stats_command, worker_command, sweep_exams_command,
+            purge_sessions_command, send_mail_command]
@@ -0,0 +1,132 @@
+import json
+import random
+import secrets
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from flask import get_template_attribute
+from markupsafe import Markup
+from .models import db, Exam, Question
+from .grading import OBJECTIVE_TYPES
+
+# Rendered exam papers are cached per worker process, like the answer keys in
+# grading.py: edits through this worker invalidate immediately, the TTL bounds
+# staleness elsewhere.
+EXAM_PAPER_CACHE_SIZE = 64
+EXAM_PAPER_CACHE_TTL = 60  # seconds
+
+_paper_cache = OrderedDict()
+_paper_lock = threading.Lock()
+_build_locks = defaultdict(threading.Lock)
+
+def new_shuffle_seed():
+    """A random seed for a new attempt; stored on ExamSubmission.shuffle_seed."""
+    return secrets.randbits(31)
+
+def permutation(n, rng):
+    """Fisher-Yates shuffle of range(n) in O(n).
+
+    Only rng.random() is used, whose sequence for a given seed is stable across
+    Python versions, so a stored seed always reproduces the same order.
+    """
+    order = list(range(n))
+    for i in range(n - 1, 0, -1):
+        j = int(rng.random() * (i + 1))
+        order[i], order[j] = order[j], order[i]
+    return order
+
+class ExamPaper:
+    """What every student sitting an exam sees: exam details and the pre-rendered questions.
+
+    Built without the correct answers, so it is safe to hand to the template.
+    `questions` holds (question_id, stem html, option htmls) in question id order.
+    """
+    __slots__ = ('id', 'title', 'duration', 'end_time', 'randomize_questions', 'randomize_options', 'questions',
+                 'question_ids', 'loaded_at')
+
+    def __init__(self, exam, questions):
+        self.id = exam.id
+        self.title = exam.title
+        self.duration = exam.duration
+        self.end_time = exam.end_time
+        self.randomize_questions = exam.randomize_questions
+        self.randomize_options = exam.randomize_options
+        self.questions = questions
+        self.question_ids = frozenset(question[0] for question in questions)
+        self.loaded_at = time.monotonic()
+
+    def ordered_questions(self, seed):
+        """Returns (question_id, html) in the order the attempt with this seed sees them.
+
+        Questions are permuted with random.Random(seed) and each question's options
+        with a generator seeded by the seed and question id, so reloading the page
+        or auditing an attempt later always gives the same order.
+        """
+        indices = range(len(self.questions))
+        if self.randomize_questions:
+            indices = permutation(len(self.questions), random.Random(seed))
+        ordered = []
+        for index in indices:
+            question_id, stem, options = self.questions[index]
+            if self.randomize_options and len(options) > 1:
+                option_order = permutation(len(options), random.Random(f'{seed}:{question_id}'))
+                options = [options[i] for i in option_order]
+            ordered.append((question_id, stem + Markup('').join(options)))
+        return ordered
+
+def _build_exam_paper(exam_id):
+    exam = db.session.get(Exam, exam_id)
+    if exam is None:
+        return None
+    rows = db.session.query(Question.id, Question.question_text, Question.question_image,
+                            Question.question_type, Question.options)\
+        .filter(Question.exam_id == exam_id).order_by(Question.id).all()
+    render_stem = get_template_attribute('_exam_question.html', 'question_stem')
+    render_option = get_template_attribute('_exam_question.html', 'choice_option')
+    questions = []
+    for row in rows:
+        stem = render_stem(row.id, row.question_text, row.question_image, row.question_type)
+        options = ()
+        if row.question_type in OBJECTIVE_TYPES:
+            stored = json.loads(row.options) if isinstance(row.options, str) else row.options or []
+            options = tuple(render_option(row.id, row.question_type, index, option.get('text'))
+                            for index, option in enumerate(stored))
+        questions.append((row.id, stem, options))
+    return ExamPaper(exam, tuple(questions))
+
+def get_exam_paper(exam_id):
+    """Returns the cached ExamPaper of an exam, or None if the exam does not exist.
+
+    Only one request per process builds a missing paper; concurrent requests for
+    the same exam wait for it instead of rendering the same questions again.
+    """
+    with _paper_lock:
+        paper = _paper_cache.get(exam_id)
+        if paper is not None and time.monotonic() - paper.loaded_at < EXAM_PAPER_CACHE_TTL:
+            _paper_cache.move_to_end(exam_id)
+            return paper
+        build_lock = _build_locks[exam_id]
+
+    with build_lock:
+        with _paper_lock:
+            paper = _paper_cache.get(exam_id)
+            if paper is not None and time.monotonic() - paper.loaded_at < EXAM_PAPER_CACHE_TTL:
+                return paper
+        paper = _build_exam_paper(exam_id)
+        if paper is not None:
+            with _paper_lock:
+                _paper_cache[exam_id] = paper
+                while len(_paper_cache) > EXAM_PAPER_CACHE_SIZE:
+                    evicted, _ = _paper_cache.popitem(last=False)
+                    _build_locks.pop(evicted, None)
+        else:
+            # Unknown exam ids must not leave a lock behind for every id ever requested.
+            with _paper_lock:
+                _build_locks.pop(exam_id, None)
+        return paper
+
+def invalidate_exam_paper(exam_id):
+    """Drops the cached paper of an exam after the exam or its questions change."""
+    with _paper_lock:
+        _paper_cache.pop(exam_id, None)
+        _build_locks.pop(exam_id, None)
@@ -0,0 +1,96 @@
+import signal
+import time
+from datetime import datetime, timedelta
+import pytz
+from flask import current_app
+from sqlalchemy import func
+from .models import db, Exam, ExamSubmission
+from .grading import grade_submissions
+from .stats import record_submissions
+
+SWEEP_BATCH_SIZE = 200
+
+def submission_deadline(start_time, duration, exam_end_time=None):
+    """When an attempt must be finished: start + duration minutes, or the exam's end time if sooner.
+
+    Never earlier than the start itself, so an attempt can't end before it began.
+    """
+    deadline = start_time + timedelta(minutes=int(duration))
+    if exam_end_time is not None and exam_end_time < deadline:
+        return max(exam_end_time, start_time)
+    return deadline
+
+def is_expired(start_time, duration, exam_end_time=None, now=None):
+    """True once the deadline plus EXAM_GRACE_SECONDS has passed.
+
+    The grace period absorbs network latency so that the browser's final autosave
+    and submit, sent when its timer reaches zero, are still accepted.
+    """
+    now = now or datetime.now(pytz.utc)
+    grace = timedelta(seconds=current_app.config['EXAM_GRACE_SECONDS'])
+    return now > submission_deadline(start_time, duration, exam_end_time) + grace
+
+def deadline_expression():
+    """submission_deadline() as SQL, for queries joining exam_submissions to exams."""
+    by_duration = ExamSubmission.start_time + func.make_interval(0, 0, 0, 0, 0, Exam.duration)
+    return func.greatest(ExamSubmission.start_time, func.least(by_duration, func.coalesce(Exam.end_time, by_duration)))
+
+def finalize_submissions(submissions, end_times):
+    """Marks attempts submitted, grades them and adds them to the exam stats. The caller commits.
+
+    `end_times` maps submission id to the end time to record. Callers must hold a row
+    lock on each submission so that no attempt is finalized twice.
+    """
+    for submission in submissions:
+        submission.status = 'submitted'
+        submission.end_time = end_times[submission.id]
+    outcomes = grade_submissions(submissions)
+    record_submissions(submissions, outcomes)
+
+def sweep_expired_submissions(batch_size=SWEEP_BATCH_SIZE):
+    """Submits every in-progress attempt whose deadline and grace period have passed.
+
+    Attempts are locked with FOR UPDATE SKIP LOCKED, finalized with their deadline as
+    the end time and committed in batches. Returns the number of attempts submitted.
+    """
+    total = 0
+    while True:
+        cutoff = datetime.now(pytz.utc) - timedelta(seconds=current_app.config['EXAM_GRACE_SECONDS'])
+        deadline = deadline_expression()
+        rows = db.session.query(ExamSubmission, deadline)\
+            .join(Exam, Exam.id == ExamSubmission.exam_id)\
+            .filter(ExamSubmission.status == 'in-progress', deadline < cutoff)\
+            .order_by(ExamSubmission.id).limit(batch_size)\
+            .with_for_update(of=ExamSubmission, skip_locked=True).all()
+        if not rows:
+            db.session.rollback()
+            return total
+        submissions = [submission for submission, _ in rows]
+        finalize_submissions(submissions, {submission.id: end_time for submission, end_time in rows})
+        db.session.commit()
+        total += len(submissions)
+        if len(rows) < batch_size:
+            return total
+
+def run_sweeper(interval=30.0, once=False):
+    """Sweeps expired attempts every `interval` seconds until stopped. Returns the number submitted."""
+    stopping = []
+    def stop(signum, frame):
+        stopping.append(signum)
+    previous = {sig: signal.signal(sig, stop) for sig in (signal.SIGTERM, signal.SIGINT)}
+
+    total = 0
+    try:
+        while not stopping:
+            swept = sweep_expired_submissions()
+            if swept:
+                current_app.logger.info('Auto-submitted %d expired exam attempts.', swept)
+            total += swept
+            db.session.remove()
+            if once:
+                break
+            time.sleep(interval)
+    finally:
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
+    return total
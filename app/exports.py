@@ -0,0 +1,88 @@
+import csv
+import io
+import tempfile
+from .models import db, User, Question, ExamSubmission
+from .analytics import get_exam_analytics
+
+EXPORT_FETCH_BATCH = 1000
+CSV_FLUSH_ROWS = 500
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+RESULT_COLUMNS = ['fullname', 'score', 'total_questions', 'answered_questions', 'unanswered_questions',
+                  'correct_answers', 'incorrect_answers', 'time_taken']
+USER_COLUMNS = ['fullname', 'email', 'role', 'gender', 'class']
+
+def format_time_taken(time_taken):
+    if not time_taken:
+        return 'N/A'
+    seconds = time_taken.total_seconds()
+    return f'{int(seconds // 60)}m {int(seconds % 60)}s'
+
+def iter_result_rows(exam_id):
+    """Yields one RESULT_COLUMNS row per submitted attempt, read through a server-side cursor.
+
+    Attempts submitted before per-submission counts were recorded have no
+    answered_count; until `flask rebuild-stats` backfills them such exams are
+    exported from the computed analytics instead.
+    """
+    legacy = db.session.query(ExamSubmission.id).filter(
+        ExamSubmission.exam_id == exam_id, ExamSubmission.status == 'submitted',
+        ExamSubmission.answered_count.is_(None)
+    ).first()
+    if legacy:
+        for sub in get_exam_analytics(exam_id)['submissions']:
+            yield [sub['fullname'], sub['score'], sub['total_questions'], sub['answered_questions'],
+                   sub['unanswered_questions'], sub['correct_answers'], sub['incorrect_answers'],
+                   format_time_taken(sub['time_taken'])]
+        return
+
+    total_questions = db.session.query(db.func.count(Question.id)).filter(Question.exam_id == exam_id).scalar()
+    rows = db.session.query(
+        User.fullname, ExamSubmission.score, ExamSubmission.start_time, ExamSubmission.end_time,
+        ExamSubmission.answered_count, ExamSubmission.correct_count
+    ).join(User, ExamSubmission.student_id == User.id)\
+    .filter(ExamSubmission.exam_id == exam_id, ExamSubmission.status == 'submitted')\
+    .order_by(ExamSubmission.id).yield_per(EXPORT_FETCH_BATCH)
+    for fullname, score, start_time, end_time, answered, correct in rows:
+        time_taken = end_time - start_time if end_time and start_time else None
+        yield [fullname, score, total_questions, answered, total_questions - answered,
+               correct, answered - correct, format_time_taken(time_taken)]
+
+def iter_user_rows():
+    """Yields one USER_COLUMNS row per user, read through a server-side cursor."""
+    rows = db.session.query(User.fullname, User.email, User.role, User.gender, User.class_)\
+        .order_by(User.id).yield_per(EXPORT_FETCH_BATCH)
+    for row in rows:
+        yield list(row)
+
+def stream_csv(header, rows):
+    """Yields CSV text in blocks of CSV_FLUSH_ROWS rows, so no more than one block is held in memory."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for count, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if count % CSV_FLUSH_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def write_xlsx(header, rows, sheet_name):
+    """Writes rows to an .xlsx temporary file and returns it rewound.
+
+    xlsxwriter's constant_memory mode flushes each row to disk as soon as the
+    next one starts, and the finished workbook goes to a temporary file rather
+    than memory, so memory use does not grow with the row count.
+    """
+    import xlsxwriter  # imported on first export rather than at worker start
+    output = tempfile.TemporaryFile()
+    workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+    worksheet = workbook.add_worksheet(sheet_name)
+    bold = workbook.add_format({'bold': True})
+    worksheet.write_row(0, 0, header, bold)
+    for row_number, row in enumerate(rows, start=1):
+        worksheet.write_row(row_number, 0, row)
+    workbook.close()
+    output.seek(0)
+    return output
@@ -0,0 +1,13 @@
+from flask_login import LoginManager
+from flask_mail import Mail
+from flask_migrate import Migrate
+from .identity import get_user_identity
+
+mail = Mail()
+migrate = Migrate()
+login_manager = LoginManager()
+login_manager.login_view = 'auth.student_login'
+
+@login_manager.user_loader
+def load_user(user_id):
+    return get_user_identity(int(user_id))
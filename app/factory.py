@@ -0,0 +1,130 @@
+import os
+from urllib.parse import quote
+from datetime import timedelta
+from functools import lru_cache
+from flask import Flask, current_app, request, redirect, url_for, flash, has_request_context
+from .models import db
+from .extensions import mail, migrate, login_manager
+from .blueprints import BLUEPRINTS, load_blueprint
+from .commands import COMMANDS
+from .helpers import from_json, strftime_wat
+from .instrumentation import init_instrumentation
+from .sessions import refresh_session, init_sessions
+
+def _load_config(app):
+    app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'your_secret_key')
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['UPLOAD_FOLDER'] = 'app/static/uploads'
+    app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(minutes=int(os.environ.get('SESSION_LIFETIME_MINUTES', 30))) # Session timeout
+    app.config['SESSION_REFRESH_EACH_REQUEST'] = False # refresh_session() decides when the cookie is re-sent
+    app.config['SESSION_REFRESH_FRACTION'] = float(os.environ.get('SESSION_REFRESH_FRACTION', 0.5)) # Share of the lifetime before it slides
+    app.config['SESSION_BACKEND'] = os.environ.get('SESSION_BACKEND', 'database') # 'database' or 'cookie'
+    app.config['SESSION_DATABASE_URL'] = os.environ.get('SESSION_DATABASE_URL') # Defaults to DATABASE_URL
+    app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_UPLOAD_MB', 50)) * 1024 * 1024 # Upload size limit
+    app.config['EXAM_GRACE_SECONDS'] = int(os.environ.get('EXAM_GRACE_SECONDS', 30)) # Leeway after an attempt's deadline
+    app.config['PASSWORD_HASH_WORKERS'] = int(os.environ.get('PASSWORD_HASH_WORKERS', 0)) or None # Defaults to CPU count
+
+    # Mail configuration
+    app.config['MAIL_SERVER'] = os.environ.get('MAIL_SERVER')
+    app.config['MAIL_PORT'] = int(os.environ.get('MAIL_PORT', 587))
+    app.config['MAIL_USE_TLS'] = os.environ.get('MAIL_USE_TLS', 'True').lower() in ['true', 'on', '1']
+    app.config['MAIL_USERNAME'] = os.environ.get('MAIL_USERNAME')
+    app.config['MAIL_PASSWORD'] = os.environ.get('MAIL_PASSWORD')
+    app.config['MAIL_DEFAULT_SENDER'] = os.environ.get('MAIL_USERNAME')
+    app.config['MAIL_BATCH_SIZE'] = int(os.environ.get('MAIL_BATCH_SIZE', 50)) # Emails sent per SMTP connection
+    app.config['MAIL_MAX_ATTEMPTS'] = int(os.environ.get('MAIL_MAX_ATTEMPTS', 5))
+    app.config['MAIL_RETRY_BASE_SECONDS'] = int(os.environ.get('MAIL_RETRY_BASE_SECONDS', 60))
+    app.config['MAIL_RETRY_MAX_SECONDS'] = int(os.environ.get('MAIL_RETRY_MAX_SECONDS', 3600))
+    app.config['MAIL_LOCK_TIMEOUT_SECONDS'] = int(os.environ.get('MAIL_LOCK_TIMEOUT_SECONDS', 600))
+
+    # Google OAuth Configuration
+    app.config['GOOGLE_CLIENT_ID'] = os.environ.get('GOOGLE_CLIENT_ID', 'YOUR_GOOGLE_CLIENT_ID')
+    app.config['GOOGLE_CLIENT_SECRET'] = os.environ.get('GOOGLE_CLIENT_SECRET', 'YOUR_GOOGLE_CLIENT_SECRET')
+    app.config['REDIRECT_URI'] = '/google/callback'
+
+    # Allow insecure transport for development only.
+    if os.environ.get('FLASK_DEBUG') == '1':
+        os.environ['OAUTHLIB_INSECURE_TRANSPORT'] = '1'
+
+    # Performance instrumentation
+    app.config['PERF_SERVER_TIMING'] = os.environ.get('PERF_SERVER_TIMING', 'False').lower() in ['true', 'on', '1']
+    app.config['PERF_N_PLUS_ONE_THRESHOLD'] = int(os.environ.get('PERF_N_PLUS_ONE_THRESHOLD', 25))
+    app.config['PERF_METRICS_TOKEN'] = os.environ.get('PERF_METRICS_TOKEN')
+    app.config['PERF_SLOW_QUERY_MS'] = int(os.environ.get('PERF_SLOW_QUERY_MS', 500)) # Statements slower than this are logged
+
+    app.config['REPORT_CACHE_FOLDER'] = os.environ.get('REPORT_CACHE_FOLDER', os.path.join(app.instance_path, 'report_cache'))
+    app.config['PDF_UNICODE_FONT'] = os.environ.get('PDF_UNICODE_FONT') # Path to a .ttf font for non-latin names in PDFs
+
+    # Background jobs (run by `flask worker`)
+    app.config['JOB_MAX_ATTEMPTS'] = int(os.environ.get('JOB_MAX_ATTEMPTS', 3))
+    app.config['JOB_RETRY_BASE_SECONDS'] = int(os.environ.get('JOB_RETRY_BASE_SECONDS', 30))
+    app.config['JOB_RETRY_MAX_SECONDS'] = int(os.environ.get('JOB_RETRY_MAX_SECONDS', 3600))
+    app.config['JOB_LOCK_TIMEOUT_SECONDS'] = int(os.environ.get('JOB_LOCK_TIMEOUT_SECONDS', 1800))
+
+def create_app(config=None, blueprints=None):
+    """Builds the application.
+
+    `blueprints` names the route groups to serve (auth, student, teacher, admin,
+    export, jobs), defaulting to APP_BLUEPRINTS or all of them. A deployment can run
+    separate gunicorn pools, e.g. `gunicorn "app:create_app(blueprints=['auth', 'student'])"`
+    for exam-taking, and route paths to them at the proxy. `config` overrides
+    settings read from the environment.
+    """
+    app = Flask(__name__)
+    _load_config(app)
+    app.config.update(config or {})
+    if not app.config['SQLALCHEMY_DATABASE_URI']:
+        raise ValueError("FATAL: DATABASE_URL environment variable is not set.")
+    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True) # Create upload folder if it doesn't exist
+
+    db.init_app(app)
+    migrate.init_app(app, db)
+    mail.init_app(app)
+    login_manager.init_app(app)
+    init_sessions(app)
+    init_instrumentation(app)
+
+    if blueprints is None:
+        blueprints = [name.strip() for name in os.environ.get('APP_BLUEPRINTS', ','.join(BLUEPRINTS)).split(',')]
+    for name in blueprints:
+        app.register_blueprint(load_blueprint(name))
+    app.url_build_error_handlers.append(_url_for_other_pool)
+
+    app.jinja_env.filters['fromjson'] = from_json
+    app.jinja_env.filters['strftime_wat'] = strftime_wat
+    app.before_request(refresh_session)
+
+    @app.errorhandler(413)
+    def upload_too_large(e):
+        flash(f"The uploaded file is larger than the {app.config['MAX_CONTENT_LENGTH'] // (1024 * 1024)} MB limit.")
+        return redirect(request.referrer or url_for('auth.index'))
+
+    for command in COMMANDS:
+        app.cli.add_command(command)
+    return app
+
+@lru_cache(maxsize=None)
+def _full_url_map():
+    """The URL rules of every blueprint, for linking to pages this pool does not serve."""
+    app = Flask(__name__)
+    for name in BLUEPRINTS:
+        app.register_blueprint(load_blueprint(name))
+    return app.url_map
+
+def _url_for_other_pool(error, endpoint, values):
+    blueprint = endpoint.partition('.')[0]
+    if blueprint not in BLUEPRINTS or not has_request_context():
+        return None  # Flask re-raises the BuildError
+    if blueprint in current_app.blueprints:
+        return None
+    values = dict(values)
+    anchor = values.pop('_anchor', None)
+    method = values.pop('_method', None)
+    scheme = values.pop('_scheme', None)
+    external = values.pop('_external', None)
+    adapter = _full_url_map().bind_to_environ(request.environ)
+    url = adapter.build(endpoint, values, method=method, url_scheme=scheme, force_external=bool(external or scheme))
+    if anchor is not None:
+        url += '#' + quote(anchor, safe="%!#$&'()*+,/:;=?@")
+    return url
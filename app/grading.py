@@ -0,0 +1,141 @@
+import json
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from .models import db, Question, ExamSubmission, StudentAnswer
+
+OBJECTIVE_TYPES = ('single-choice', 'multiple-choice')
+
+# Compiled answer keys are cached per worker process. Edits made through this worker
+# invalidate the entry immediately; the TTL bounds staleness in the other workers.
+ANSWER_KEY_CACHE_SIZE = 256
+ANSWER_KEY_CACHE_TTL = 60  # seconds
+
+_answer_key_cache = OrderedDict()
+_answer_key_lock = threading.Lock()
+
+def _choice_set(value):
+    """Returns the set of option indices stored in a correct_answer or answer_text value."""
+    if value is None:
+        return frozenset()
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            value = value.split(',')
+    if not isinstance(value, (list, tuple)):
+        value = [value]
+    return frozenset(str(v).strip() for v in value)
+
+def _normalize_text(value):
+    return str(value).strip().casefold()
+
+class AnswerKey:
+    """The normalized correct answers of one exam, keyed by question id."""
+    __slots__ = ('exam_id', 'choices', 'texts', 'loaded_at')
+
+    def __init__(self, exam_id, choices, texts):
+        self.exam_id = exam_id
+        self.choices = choices  # question_id -> frozenset of option indices
+        self.texts = texts      # question_id -> casefolded answer
+        self.loaded_at = time.monotonic()
+
+    @property
+    def objective_count(self):
+        return len(self.choices)
+
+    def is_correct(self, question_id, answer_text):
+        if answer_text is None:
+            return False
+        correct = self.choices.get(question_id)
+        if correct is not None:
+            return frozenset(a.strip() for a in answer_text.split(',')) == correct
+        correct = self.texts.get(question_id)
+        if correct is not None:
+            return _normalize_text(answer_text) == correct
+        return False
+
+def _compile_answer_keys(exam_ids):
+    keys = {exam_id: AnswerKey(exam_id, {}, {}) for exam_id in exam_ids}
+    rows = db.session.query(Question.exam_id, Question.id, Question.question_type, Question.correct_answer)\
+        .filter(Question.exam_id.in_(list(keys))).all()
+    for exam_id, question_id, question_type, correct_answer in rows:
+        key = keys[exam_id]
+        if question_type in OBJECTIVE_TYPES:
+            key.choices[question_id] = _choice_set(correct_answer)
+        elif correct_answer is not None:
+            key.texts[question_id] = _normalize_text(correct_answer)
+    return keys
+
+def get_answer_keys(exam_ids):
+    """Returns exam_id -> AnswerKey, compiling any uncached keys with a single query."""
+    keys = {}
+    missing = []
+    now = time.monotonic()
+    with _answer_key_lock:
+        for exam_id in set(exam_ids):
+            key = _answer_key_cache.get(exam_id)
+            if key is not None and now - key.loaded_at < ANSWER_KEY_CACHE_TTL:
+                _answer_key_cache.move_to_end(exam_id)
+                keys[exam_id] = key
+            else:
+                missing.append(exam_id)
+
+    if missing:
+        compiled = _compile_answer_keys(missing)
+        keys.update(compiled)
+        with _answer_key_lock:
+            _answer_key_cache.update(compiled)
+            while len(_answer_key_cache) > ANSWER_KEY_CACHE_SIZE:
+                _answer_key_cache.popitem(last=False)
+    return keys
+
+def get_answer_key(exam_id):
+    return get_answer_keys([exam_id])[exam_id]
+
+def invalidate_answer_key(exam_id):
+    """Drops the cached answer key of an exam after its questions change."""
+    with _answer_key_lock:
+        _answer_key_cache.pop(exam_id, None)
+
+def grade_submissions(submissions):
+    """Scores many submissions at once with one query for answer keys and one for answers.
+
+    The score, answered_count and correct_count are assigned on each submission object;
+    committing is left to the caller so that they land in the same transaction as any
+    status change. Returns submission_id -> {question_id: is_correct} for the answers
+    that were graded, so callers can update statistics without re-reading them.
+    """
+    submissions = [s for s in submissions if s is not None]
+    if not submissions:
+        return {}
+
+    keys = get_answer_keys(s.exam_id for s in submissions)
+    by_id = {s.id: s for s in submissions}
+
+    answers = defaultdict(list)
+    rows = db.session.query(StudentAnswer.submission_id, StudentAnswer.question_id, StudentAnswer.answer_text)\
+        .filter(StudentAnswer.submission_id.in_(list(by_id))).all()
+    for submission_id, question_id, answer_text in rows:
+        answers[submission_id].append((question_id, answer_text))
+
+    outcomes = {}
+    for submission_id, submission in by_id.items():
+        key = keys[submission.exam_id]
+        results = {question_id: key.is_correct(question_id, answer_text)
+                   for question_id, answer_text in answers[submission_id]}
+        objective_correct = sum(1 for question_id, is_correct in results.items()
+                                if is_correct and question_id in key.choices)
+        submission.score = (objective_correct / key.objective_count) * 100 if key.objective_count else 0
+        submission.answered_count = len(results)
+        submission.correct_count = sum(results.values())
+        outcomes[submission_id] = results
+    return outcomes
+
+def calculate_score(submission_id):
+    """Grades a single submission. The caller is responsible for committing."""
+    submission = ExamSubmission.query.get(submission_id)
+    if not submission:
+        return None
+    grade_submissions([submission])
+    return submission.score
@@ -0,0 +1,45 @@
+import json
+from datetime import datetime
+import pytz
+from .models import db, User
+from .mailer import queue_email
+
+def get_wat_now():
+    """Returns the current time in WAT (UTC+1) as a timezone-aware datetime object."""
+    utc_now = pytz.utc.localize(datetime.utcnow())
+    wat = pytz.timezone('Africa/Lagos')
+    return utc_now.astimezone(wat)
+
+def get_class_sizes(classes):
+    """Returns class name -> number of students for the given classes in one grouped query."""
+    classes = {c for c in classes if c}
+    if not classes:
+        return {}
+    return dict(db.session.query(User.class_, db.func.count(User.id))
+                .filter(User.role == 'student', User.class_.in_(classes))
+                .group_by(User.class_).all())
+
+def send_email(subject, recipients, body):
+    """Adds an email to the outbox; `flask send-mail` delivers it, so SMTP never delays the request."""
+    queue_email(subject, recipients, body)
+    db.session.commit()
+
+def from_json(value):
+    if isinstance(value, str):
+        return json.loads(value)
+    return value
+
+def strftime_wat(date, fmt=None):
+    if fmt is None:
+        fmt = '%B %d, %Y at %I:%M %p' # e.g., November 04, 2025 at 03:45 PM
+
+    wat_tz = pytz.timezone('Africa/Lagos')
+
+    if date.tzinfo is None:
+        # If the date is naive, assume it is in WAT
+        date = wat_tz.localize(date)
+    else:
+        # If it is aware, convert it to WAT
+        date = date.astimezone(wat_tz)
+
+    return date.strftime(fmt)
@@ -0,0 +1,58 @@
+import threading
+import time
+from collections import OrderedDict
+from flask_login import UserMixin
+from .models import db, User
+
+# Loaded users are cached per worker process, like the answer keys in grading.py:
+# edits through this worker invalidate immediately, the TTL bounds how long another
+# worker keeps serving a changed or deleted user.
+IDENTITY_CACHE_SIZE = 4096
+IDENTITY_CACHE_TTL = 30  # seconds
+
+_identity_cache = OrderedDict()
+_identity_lock = threading.Lock()
+
+class UserIdentity(UserMixin):
+    """The logged-in user as `current_user` sees it: a read-only copy of the users row.
+
+    It is not attached to the database session, so routes that change the user
+    load the User row itself and call invalidate_user() afterwards.
+    """
+    __slots__ = ('id', 'fullname', 'email', 'role', 'gender', 'class_', 'status', 'profile_image', 'loaded_at')
+
+    def __init__(self, row):
+        self.id = row.id
+        self.fullname = row.fullname
+        self.email = row.email
+        self.role = row.role
+        self.gender = row.gender
+        self.class_ = row.class_
+        self.status = row.status
+        self.profile_image = row.profile_image
+        self.loaded_at = time.monotonic()
+
+def get_user_identity(user_id):
+    """Returns the cached UserIdentity of a user, or None if the user does not exist."""
+    with _identity_lock:
+        identity = _identity_cache.get(user_id)
+        if identity is not None and time.monotonic() - identity.loaded_at < IDENTITY_CACHE_TTL:
+            _identity_cache.move_to_end(user_id)
+            return identity
+
+    row = db.session.query(User.id, User.fullname, User.email, User.role, User.gender, User.class_,
+                           User.status, User.profile_image).filter(User.id == user_id).first()
+    if row is None:
+        invalidate_user(user_id)
+        return None
+    identity = UserIdentity(row)
+    with _identity_lock:
+        _identity_cache[user_id] = identity
+        while len(_identity_cache) > IDENTITY_CACHE_SIZE:
+            _identity_cache.popitem(last=False)
+    return identity
+
+def invalidate_user(user_id):
+    """Drops the cached identity of a user after the user is edited or deleted."""
+    with _identity_lock:
+        _identity_cache.pop(user_id, None)
@@ -0,0 +1,128 @@
+import hmac
+import os
+import re
+import threading
+import time
+from flask import g, request, has_request_context, make_response, abort, before_render_template, template_rendered
+from flask_login import current_user
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, REGISTRY, generate_latest, multiprocess
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+STATEMENT_PREVIEW_LENGTH = 200
+
+# With PROMETHEUS_MULTIPROC_DIR set (gunicorn.conf.py sets it for the web process)
+# every worker writes its counters there and /metrics adds up all workers, so a
+# scrape gives the same totals whichever worker answers it.
+REQUESTS = Counter('cbt_http_requests', 'Requests handled.', ['endpoint'])
+REQUEST_SECONDS = Counter('cbt_http_request_seconds', 'Wall time spent handling requests.', ['endpoint'])
+QUERIES = Counter('cbt_db_queries', 'SQL statements executed.', ['endpoint'])
+DB_SECONDS = Counter('cbt_db_seconds', 'Time spent executing SQL statements.', ['endpoint'])
+RENDER_SECONDS = Counter('cbt_template_render_seconds', 'Time spent rendering templates.', ['endpoint'])
+MAX_QUERIES = Gauge('cbt_db_queries_max', 'Most SQL statements executed by a single request.', ['endpoint'],
+                    multiprocess_mode='max')
+N_PLUS_ONE_WARNINGS = Counter('cbt_n_plus_one_warnings', 'Requests over the N+1 query threshold.', ['endpoint'])
+SLOW_STATEMENTS = Counter('cbt_db_slow_statements', 'SQL statements slower than PERF_SLOW_QUERY_MS.', ['endpoint'])
+
+_max_queries = {}
+_max_queries_lock = threading.Lock()
+
+def _preview(statement):
+    return re.sub(r'\s+', ' ', statement).strip()[:STATEMENT_PREVIEW_LENGTH]
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the execution context, so a statement that raises leaves nothing behind.
+    if context is not None and has_request_context() and 'perf' in g:
+        context.perf_query_start = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, 'perf_query_start', None)
+    if start is None or not has_request_context() or 'perf' not in g:
+        return
+    elapsed = time.perf_counter() - start
+    perf = g.perf
+    perf['queries'] += 1
+    perf['db_time'] += elapsed
+    if elapsed >= perf['slow_query_seconds']:
+        perf['slow_statements'].append((elapsed, statement))
+
+def _before_render(sender, template, context, **extra):
+    if 'perf' in g:
+        g.perf['render_start'] = time.perf_counter()
+
+def _after_render(sender, template, context, **extra):
+    if 'perf' in g and g.perf.get('render_start') is not None:
+        g.perf['render_time'] += time.perf_counter() - g.perf.pop('render_start')
+
+def _record(app, endpoint, perf, total):
+    threshold = app.config.get('PERF_N_PLUS_ONE_THRESHOLD', 0)
+    too_many = threshold and perf['queries'] > threshold
+    REQUESTS.labels(endpoint).inc()
+    REQUEST_SECONDS.labels(endpoint).inc(total)
+    QUERIES.labels(endpoint).inc(perf['queries'])
+    DB_SECONDS.labels(endpoint).inc(perf['db_time'])
+    RENDER_SECONDS.labels(endpoint).inc(perf['render_time'])
+    with _max_queries_lock:
+        if perf['queries'] > _max_queries.get(endpoint, -1):
+            _max_queries[endpoint] = perf['queries']
+            MAX_QUERIES.labels(endpoint).set(perf['queries'])
+    if too_many:
+        N_PLUS_ONE_WARNINGS.labels(endpoint).inc()
+        app.logger.warning('%s ran %d SQL statements (threshold %d); possible N+1 query pattern.',
+                           endpoint, perf['queries'], threshold)
+    for elapsed, statement in perf['slow_statements']:
+        SLOW_STATEMENTS.labels(endpoint).inc()
+        app.logger.warning('Slow SQL statement on %s (%.0f ms): %s', endpoint, elapsed * 1000, _preview(statement))
+
+def render_metrics():
+    """Formats the collected totals in the Prometheus text exposition format, summed over all workers."""
+    registry = REGISTRY
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry)
+
+def init_instrumentation(app):
+    """Hooks SQLAlchemy and Flask so every request records query counts and timings.
+
+    Totals are exposed at /metrics and statements slower than PERF_SLOW_QUERY_MS
+    are logged. Set PERF_SERVER_TIMING to also send a Server-Timing header with
+    each response.
+    """
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_after_render, app)
+
+    @app.before_request
+    def _start_request_timer():
+        g.perf = {'start': time.perf_counter(), 'queries': 0, 'db_time': 0.0, 'render_time': 0.0,
+                  'slow_query_seconds': app.config['PERF_SLOW_QUERY_MS'] / 1000, 'slow_statements': []}
+
+    @app.after_request
+    def _record_request(response):
+        perf = g.pop('perf', None)
+        if perf is None:
+            return response
+        total = time.perf_counter() - perf['start']
+        endpoint = request.endpoint or 'unmatched'
+        _record(app, endpoint, perf, total)
+        if app.config.get('PERF_SERVER_TIMING'):
+            response.headers['Server-Timing'] = ', '.join([
+                f'db;desc="{perf["queries"]} queries";dur={perf["db_time"] * 1000:.1f}',
+                f'render;dur={perf["render_time"] * 1000:.1f}',
+                f'total;dur={total * 1000:.1f}',
+            ])
+        return response
+
+    @app.route('/metrics')
+    def metrics():
+        token = app.config.get('PERF_METRICS_TOKEN')
+        if token:
+            supplied = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+            if not hmac.compare_digest(supplied.encode(), token.encode()):
+                abort(403)
+        elif not (current_user.is_authenticated and current_user.role == 'admin'):
+            abort(403)
+        return make_response(render_metrics(), 200, {'Content-Type': CONTENT_TYPE_LATEST})
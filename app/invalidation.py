@@ -0,0 +1,9 @@
+from .grading import invalidate_answer_key
+from .reports import invalidate_results_report
+from .exam_paper import invalidate_exam_paper
+
+def questions_changed(exam_id):
+    """Drops everything cached from an exam's questions after they are added, edited or deleted."""
+    invalidate_answer_key(exam_id)
+    invalidate_results_report(exam_id)
+    invalidate_exam_paper(exam_id)
@@ -0,0 +1,270 @@
+import io
+import multiprocessing
+import os
+import signal
+import socket
+import time
+from datetime import datetime, timedelta
+import pytz
+from flask import current_app
+from sqlalchemy import and_, or_
+from werkzeug.datastructures import FileStorage
+from .models import db, Job, JobFile, ExamSubmission
+from .grading import grade_submissions
+from .invalidation import questions_changed
+from .stats import rebuild_exam_stats
+
+JOB_HANDLERS = {}
+MAX_STORED_ERROR_LENGTH = 4000
+MAX_REPORTED_ROWS = 200
+
+class PermanentJobError(Exception):
+    """Raised by a job handler when retrying cannot help, e.g. an unreadable upload."""
+
+def job_handler(kind):
+    """Registers the decorated function as the handler for jobs of this kind.
+
+    Handlers receive the job payload and return a JSON-serializable result. Any
+    exception other than PermanentJobError is retried with exponential backoff.
+    """
+    def register(func):
+        JOB_HANDLERS[kind] = func
+        return func
+    return register
+
+def enqueue(kind, payload=None, user_id=None, max_attempts=None, delay=0):
+    """Adds a job to the queue and returns it. The caller commits."""
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f'No handler registered for job kind {kind!r}.')
+    job = Job(
+        kind=kind,
+        payload=payload or {},
+        status='queued',
+        attempts=0,
+        max_attempts=max_attempts or current_app.config['JOB_MAX_ATTEMPTS'],
+        run_at=datetime.now(pytz.utc) + timedelta(seconds=delay),
+        user_id=user_id
+    )
+    db.session.add(job)
+    db.session.flush()
+    return job
+
+def save_job_file(file):
+    """Stores an upload in the job_files table and returns the payload fields describing it.
+
+    Workers run as a separate process type and do not share the web process's
+    filesystem, so the bytes travel through the database. The caller commits.
+    """
+    job_file = JobFile(filename=file.filename, data=file.read())
+    db.session.add(job_file)
+    db.session.flush()
+    return {'file_id': job_file.id, 'filename': file.filename}
+
+def _open_job_file(payload):
+    data = db.session.query(JobFile.data).filter(JobFile.id == payload['file_id']).scalar()
+    if data is None:
+        raise PermanentJobError('The uploaded file is no longer available; please upload it again.')
+    return FileStorage(stream=io.BytesIO(data), filename=payload['filename'])
+
+def _remove_job_file(payload):
+    """Deletes a finished job's upload in the caller's transaction."""
+    file_id = (payload or {}).get('file_id')
+    if file_id:
+        JobFile.query.filter_by(id=file_id).delete()
+
+def backoff_seconds(attempts):
+    """Delay before the next attempt: JOB_RETRY_BASE_SECONDS doubled per failed attempt, capped."""
+    config = current_app.config
+    return min(config['JOB_RETRY_MAX_SECONDS'], config['JOB_RETRY_BASE_SECONDS'] * 2 ** max(0, attempts - 1))
+
+def claim_job(worker_id):
+    """Locks the next due job for this worker with SELECT ... FOR UPDATE SKIP LOCKED.
+
+    Jobs left running by a worker that died (locked for longer than
+    JOB_LOCK_TIMEOUT_SECONDS) are claimed again, or failed once out of attempts.
+    """
+    while True:
+        now = datetime.now(pytz.utc)
+        stale = now - timedelta(seconds=current_app.config['JOB_LOCK_TIMEOUT_SECONDS'])
+        job = Job.query.filter(or_(
+            and_(Job.status == 'queued', Job.run_at <= now),
+            and_(Job.status == 'running', Job.locked_at < stale)
+        )).order_by(Job.run_at, Job.id).with_for_update(skip_locked=True).first()
+        if job is None:
+            db.session.rollback()
+            return None
+
+        if job.status == 'running' and job.attempts >= job.max_attempts:
+            job.status = 'failed'
+            job.last_error = f'Worker {job.locked_by} stopped while running the job.'
+            job.locked_at = job.locked_by = None
+            job.finished_at = now
+            _remove_job_file(job.payload)
+            db.session.commit()
+            continue
+
+        job.status = 'running'
+        job.attempts += 1
+        job.locked_at = now
+        job.locked_by = worker_id
+        db.session.commit()
+        return job
+
+def run_job(job):
+    """Runs a claimed job and records its result, a retry or its failure."""
+    handler = JOB_HANDLERS.get(job.kind)
+    job_id, payload, attempts = job.id, job.payload or {}, job.attempts
+    try:
+        if handler is None:
+            raise PermanentJobError(f'No handler registered for job kind {job.kind!r}.')
+        result = handler(payload)
+    except Exception as e:
+        db.session.rollback()
+        job = db.session.get(Job, job_id)
+        retry = not isinstance(e, PermanentJobError) and attempts < job.max_attempts
+        job.last_error = (str(e) or e.__class__.__name__)[:MAX_STORED_ERROR_LENGTH]
+        if retry:
+            job.status = 'queued'
+            job.run_at = datetime.now(pytz.utc) + timedelta(seconds=backoff_seconds(attempts))
+            current_app.logger.warning('Job %s (%s) failed on attempt %d, retrying at %s: %s',
+                                       job_id, job.kind, attempts, job.run_at, job.last_error)
+        else:
+            job.status = 'failed'
+            job.finished_at = datetime.now(pytz.utc)
+            current_app.logger.error('Job %s (%s) failed: %s', job_id, job.kind, job.last_error)
+    else:
+        job = db.session.get(Job, job_id)
+        job.status = 'succeeded'
+        job.result = result
+        job.last_error = None
+        job.finished_at = datetime.now(pytz.utc)
+    job.locked_at = job.locked_by = None
+    if job.status != 'queued':
+        _remove_job_file(payload)
+    db.session.commit()
+    return job
+
+def run_worker(poll_interval=2.0, burst=False, worker_id=None):
+    """Claims and runs jobs until stopped. With burst, returns once the queue is empty.
+
+    SIGTERM and SIGINT let the current job finish before the worker exits.
+    Returns the number of jobs run.
+    """
+    worker_id = worker_id or f'{socket.gethostname()}:{os.getpid()}'
+    stopping = []
+    def stop(signum, frame):
+        stopping.append(signum)
+    previous = {sig: signal.signal(sig, stop) for sig in (signal.SIGTERM, signal.SIGINT)}
+
+    processed = 0
+    try:
+        while not stopping:
+            job = claim_job(worker_id)
+            if job is None:
+                if burst:
+                    break
+                time.sleep(poll_interval)
+                continue
+            run_job(job)
+            processed += 1
+            db.session.remove()
+    finally:
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
+    return processed
+
+def run_worker_processes(app, processes, poll_interval=2.0, burst=False):
+    """Forks `processes` workers and waits for them, forwarding SIGTERM and SIGINT."""
+    def work():
+        with app.app_context():
+            db.engine.dispose(close=False)  # never share the parent's pooled connections
+            run_worker(poll_interval, burst)
+
+    db.session.remove()
+    context = multiprocessing.get_context('fork')
+    children = [context.Process(target=work, name=f'cbt-worker-{i}') for i in range(processes)]
+    for child in children:
+        child.start()
+
+    def forward(signum, frame):
+        for child in children:
+            if child.is_alive():
+                os.kill(child.pid, signum)
+    previous = {sig: signal.signal(sig, forward) for sig in (signal.SIGTERM, signal.SIGINT)}
+    try:
+        for child in children:
+            child.join()
+    finally:
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
+
+def job_as_dict(job):
+    return {
+        'id': job.id,
+        'kind': job.kind,
+        'status': job.status,
+        'attempts': job.attempts,
+        'max_attempts': job.max_attempts,
+        'run_at': job.run_at.isoformat() if job.run_at else None,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        'result': job.result,
+        'error': job.last_error
+    }
+
+@job_handler('import_users')
+def import_users_job(payload):
+    from .user_import import import_users, UserImportError  # pandas is only needed by the worker
+    file = _open_job_file(payload)
+    try:
+        summary = import_users(file, current_app.config['PASSWORD_HASH_WORKERS'])
+    except UserImportError as e:
+        raise PermanentJobError(str(e))
+    finally:
+        file.close()
+    db.session.commit()
+    return {
+        'created': summary.created,
+        'skipped': len(summary.skipped),
+        'failed': len(summary.failed),
+        'failed_rows': [list(row) for row in summary.failed[:MAX_REPORTED_ROWS]]
+    }
+
+@job_handler('import_questions')
+def import_questions_job(payload):
+    from .question_import import import_questions, QuestionImportError  # pandas is only needed by the worker
+    exam_id = payload['exam_id']
+    file = _open_job_file(payload)
+    try:
+        question_import, report = import_questions(file, exam_id)
+    except QuestionImportError as e:
+        raise PermanentJobError(str(e))
+    finally:
+        file.close()
+        questions_changed(exam_id)
+    if question_import.inserted:
+        rebuild_exam_stats([exam_id])
+        db.session.commit()
+    if isinstance(report.failure, QuestionImportError):
+        # The file itself is unreadable; running it again would fail the same way.
+        raise PermanentJobError(question_import.message)
+    if question_import.status == 'failed':
+        # Retrying the same file resumes after the last committed batch.
+        raise RuntimeError(f'Import stopped after row {question_import.rows_processed + 1}: {question_import.message}')
+    return {
+        'import_id': question_import.id,
+        'inserted': question_import.inserted,
+        'skipped': question_import.error_count,
+        'errors': (question_import.errors or [])[:MAX_REPORTED_ROWS]
+    }
+
+@job_handler('regrade_exam')
+def regrade_exam_job(payload):
+    exam_id = payload['exam_id']
+    questions_changed(exam_id)
+    submissions = ExamSubmission.query.filter_by(exam_id=exam_id, status='submitted').all()
+    grade_submissions(submissions)
+    db.session.flush()
+    rebuild_exam_stats([exam_id])
+    db.session.commit()
+    return {'regraded': len(submissions)}
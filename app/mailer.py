@@ -0,0 +1,112 @@
+import signal
+import smtplib
+import time
+from datetime import datetime, timedelta
+import pytz
+from flask import current_app
+from flask_mail import Message
+from sqlalchemy import and_, or_
+from .models import db, OutboxEmail
+
+MAX_STORED_ERROR_LENGTH = 2000
+
+def queue_email(subject, recipients, body):
+    """Adds an email to the outbox for the sender process. The caller commits."""
+    email = OutboxEmail(subject=subject[:255], recipients=list(recipients), body=body,
+                        status='pending', attempts=0, next_attempt_at=datetime.now(pytz.utc))
+    db.session.add(email)
+    return email
+
+def _retry_delay(attempts):
+    config = current_app.config
+    return min(config['MAIL_RETRY_MAX_SECONDS'], config['MAIL_RETRY_BASE_SECONDS'] * 2 ** max(0, attempts - 1))
+
+def claim_batch(batch_size):
+    """Marks up to batch_size due emails as sending and returns them.
+
+    Rows are picked with FOR UPDATE SKIP LOCKED so several senders never take the
+    same email. Emails left in 'sending' by a sender that died are picked up again
+    after MAIL_LOCK_TIMEOUT_SECONDS.
+    """
+    now = datetime.now(pytz.utc)
+    stale = now - timedelta(seconds=current_app.config['MAIL_LOCK_TIMEOUT_SECONDS'])
+    emails = OutboxEmail.query.filter(or_(
+        and_(OutboxEmail.status == 'pending', OutboxEmail.next_attempt_at <= now),
+        and_(OutboxEmail.status == 'sending', OutboxEmail.locked_at < stale)
+    )).order_by(OutboxEmail.next_attempt_at, OutboxEmail.id)\
+        .limit(batch_size).with_for_update(skip_locked=True).all()
+    for email in emails:
+        email.status = 'sending'
+        email.attempts += 1
+        email.locked_at = now
+    db.session.commit()
+    return emails
+
+def _record_failure(email, error):
+    email.last_error = (str(error) or error.__class__.__name__)[:MAX_STORED_ERROR_LENGTH]
+    email.locked_at = None
+    if email.attempts < current_app.config['MAIL_MAX_ATTEMPTS']:
+        email.status = 'pending'
+        email.next_attempt_at = datetime.now(pytz.utc) + timedelta(seconds=_retry_delay(email.attempts))
+    else:
+        email.status = 'failed'
+        current_app.logger.error('Giving up on email %s to %s: %s', email.id, email.recipients, email.last_error)
+
+def send_batch(emails):
+    """Sends claimed emails over a single SMTP connection and records each outcome.
+
+    Returns the number delivered. If the connection itself fails, every email in the
+    batch is rescheduled.
+    """
+    sent = 0
+    try:
+        with current_app.extensions['mail'].connect() as connection:
+            for email in emails:
+                msg = Message(email.subject, recipients=email.recipients, body=email.body)
+                try:
+                    connection.send(msg)
+                except smtplib.SMTPServerDisconnected:
+                    raise
+                except Exception as e:
+                    _record_failure(email, e)
+                else:
+                    email.status = 'sent'
+                    email.sent_at = datetime.now(pytz.utc)
+                    email.locked_at = None
+                    email.last_error = None
+                    sent += 1
+                db.session.commit()
+    except Exception as e:
+        current_app.logger.warning('SMTP connection failed after %d of %d emails: %s', sent, len(emails), e)
+        for email in emails:
+            if email.status == 'sending':
+                _record_failure(email, e)
+        db.session.commit()
+    return sent
+
+def run_sender(poll_interval=5.0, batch_size=None, burst=False):
+    """Delivers outbox emails in batches until stopped. With burst, returns once nothing is due.
+
+    SIGTERM and SIGINT let the current batch finish. Returns the number delivered.
+    """
+    batch_size = batch_size or current_app.config['MAIL_BATCH_SIZE']
+    stopping = []
+    def stop(signum, frame):
+        stopping.append(signum)
+    previous = {sig: signal.signal(sig, stop) for sig in (signal.SIGTERM, signal.SIGINT)}
+
+    delivered = 0
+    try:
+        while not stopping:
+            emails = claim_batch(batch_size)
+            if not emails:
+                if burst:
+                    break
+                time.sleep(poll_interval)
+                continue
+            delivered += send_batch(emails)
+            db.session.remove()
+    finally:
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
+    return delivered
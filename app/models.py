@@ -8,6 +8,9 @@ db = SQLAlchemy()
 
 class User(UserMixin, db.Model):
     __tablename__ = 'users'
+    __table_args__ = (
+        db.Index('ix_users_role_class', 'role', 'class'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     fullname = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(100), unique=True, nullable=False)
@@ -24,6 +27,9 @@ class User(UserMixin, db.Model):
 
 class Exam(db.Model):
     __tablename__ = 'exams'
+    __table_args__ = (
+        db.Index('ix_exams_teacher_created_at', 'teacher_id', 'created_at'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(255), nullable=False)
     description = db.Column(db.Text)
@@ -33,6 +39,7 @@ class Exam(db.Model):
     teacher_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     class_ = db.Column('class', db.String(50))
     randomize_questions = db.Column(db.Boolean, default=False)
+    randomize_options = db.Column(db.Boolean, default=False, server_default=db.false(), nullable=False)
     delay_results = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(pytz.utc))
 
@@ -42,7 +49,7 @@ class Exam(db.Model):
 class Question(db.Model):
     __tablename__ = 'questions'
     id = db.Column(db.Integer, primary_key=True)
-    exam_id = db.Column(db.Integer, db.ForeignKey('exams.id'), nullable=False)
+    exam_id = db.Column(db.Integer, db.ForeignKey('exams.id'), nullable=False, index=True)
     question_text = db.Column(db.Text, nullable=False)
     question_image = db.Column(db.String(255))
     question_type = db.Column(db.String(20), nullable=False)
@@ -53,6 +60,14 @@ class Question(db.Model):
 
 class ExamSubmission(db.Model):
     __tablename__ = 'exam_submissions'
+    __table_args__ = (
+        db.Index('ix_exam_submissions_exam_status', 'exam_id', 'status'),
+        db.Index('ix_exam_submissions_student_exam', 'student_id', 'exam_id'),
+        db.Index('ix_exam_submissions_submitted_end_time', 'exam_id', 'end_time',
+                 postgresql_where=db.text("status = 'submitted'")),
+        db.Index('ix_exam_submissions_in_progress_start_time', 'start_time',
+                 postgresql_where=db.text("status = 'in-progress'")),
+    )
     id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     exam_id = db.Column(db.Integer, db.ForeignKey('exams.id'), nullable=False)
@@ -60,14 +75,20 @@ class ExamSubmission(db.Model):
     end_time = db.Column(db.DateTime(timezone=True))
     score = db.Column(db.Integer)
     status = db.Column(db.String(20), default='in-progress', nullable=False)
+    answered_count = db.Column(db.Integer)
+    correct_count = db.Column(db.Integer)
+    shuffle_seed = db.Column(db.Integer)  # drives this attempt's question and option order
 
     answers = db.relationship('StudentAnswer', backref='submission', lazy=True, cascade="all, delete-orphan")
 
 class StudentAnswer(db.Model):
     __tablename__ = 'student_answers'
+    __table_args__ = (
+        db.UniqueConstraint('submission_id', 'question_id', name='uq_student_answers_submission_question'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     submission_id = db.Column(db.Integer, db.ForeignKey('exam_submissions.id'), nullable=False)
-    question_id = db.Column(db.Integer, db.ForeignKey('questions.id'), nullable=False)
+    question_id = db.Column(db.Integer, db.ForeignKey('questions.id'), nullable=False, index=True)
     answer_text = db.Column(db.Text)
 
 class PasswordResetToken(db.Model):
@@ -75,4 +96,90 @@ class PasswordResetToken(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     token = db.Column(db.String(255), unique=True, nullable=False)
-    expires_at = db.Column(db.DateTime(timezone=True), nullable=False)
\ No newline at end of file
+    expires_at = db.Column(db.DateTime(timezone=True), nullable=False)
+
+class ExamStats(db.Model):
+    __tablename__ = 'exam_stats'
+    exam_id = db.Column(db.Integer, db.ForeignKey('exams.id', ondelete='CASCADE'), primary_key=True)
+    submission_count = db.Column(db.Integer, nullable=False, default=0)
+    score_sum = db.Column(db.Float, nullable=False, default=0)
+    score_sq_sum = db.Column(db.Float, nullable=False, default=0)
+    timed_count = db.Column(db.Integer, nullable=False, default=0)
+    time_taken_sum = db.Column(db.Float, nullable=False, default=0)
+    time_taken_min = db.Column(db.Float)
+    time_taken_max = db.Column(db.Float)
+    updated_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(pytz.utc))
+
+class QuestionStats(db.Model):
+    __tablename__ = 'question_stats'
+    question_id = db.Column(db.Integer, db.ForeignKey('questions.id', ondelete='CASCADE'), primary_key=True)
+    exam_id = db.Column(db.Integer, db.ForeignKey('exams.id', ondelete='CASCADE'), nullable=False, index=True)
+    correct_count = db.Column(db.Integer, nullable=False, default=0)
+    incorrect_count = db.Column(db.Integer, nullable=False, default=0)
+
+class QuestionImport(db.Model):
+    __tablename__ = 'question_imports'
+    id = db.Column(db.Integer, primary_key=True)
+    exam_id = db.Column(db.Integer, db.ForeignKey('exams.id', ondelete='CASCADE'), nullable=False, index=True)
+    filename = db.Column(db.String(255), nullable=False)
+    checksum = db.Column(db.String(64), nullable=False)
+    status = db.Column(db.String(20), default='running', nullable=False)
+    rows_processed = db.Column(db.Integer, default=0, nullable=False)
+    inserted = db.Column(db.Integer, default=0, nullable=False)
+    error_count = db.Column(db.Integer, default=0, nullable=False)
+    errors = db.Column(JSONB)
+    message = db.Column(db.Text)
+    created_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(pytz.utc))
+    updated_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(pytz.utc))
+
+class Job(db.Model):
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        db.Index('ix_jobs_status_run_at', 'status', 'run_at'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    payload = db.Column(JSONB)
+    status = db.Column(db.String(20), default='queued', nullable=False)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    max_attempts = db.Column(db.Integer, default=3, nullable=False)
+    run_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(pytz.utc), nullable=False)
+    locked_at = db.Column(db.DateTime(timezone=True))
+    locked_by = db.Column(db.String(100))
+    result = db.Column(JSONB)
+    last_error = db.Column(db.Text)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='SET NULL'), index=True)
+    created_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(pytz.utc))
+    finished_at = db.Column(db.DateTime(timezone=True))
+
+class JobFile(db.Model):
+    """An upload waiting for a background job; kept in the database so any worker can read it."""
+    __tablename__ = 'job_files'
+    id = db.Column(db.Integer, primary_key=True)
+    filename = db.Column(db.String(255), nullable=False)
+    data = db.Column(db.LargeBinary, nullable=False)
+    created_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(pytz.utc))
+
+class OutboxEmail(db.Model):
+    __tablename__ = 'email_outbox'
+    __table_args__ = (
+        db.Index('ix_email_outbox_status_next_attempt_at', 'status', 'next_attempt_at'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    recipients = db.Column(JSONB, nullable=False)
+    subject = db.Column(db.String(255), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), default='pending', nullable=False)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    next_attempt_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(pytz.utc), nullable=False)
+    locked_at = db.Column(db.DateTime(timezone=True))
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(pytz.utc))
+    sent_at = db.Column(db.DateTime(timezone=True))
+
+class ServerSession(db.Model):
+    __tablename__ = 'sessions'
+    id = db.Column(db.String(64), primary_key=True)
+    data = db.Column(db.Text, nullable=False)
+    user_id = db.Column(db.Integer, index=True)
+    expires_at = db.Column(db.DateTime(timezone=True), nullable=False, index=True)
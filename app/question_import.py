@@ -0,0 +1,244 @@
+import hashlib
+from datetime import datetime
+import openpyxl
+import pandas as pd
+import pytz
+from sqlalchemy import insert
+from .models import db, Question, QuestionImport
+
+REQUIRED_COLUMNS = ['question_text', 'question_type', 'correct_answer']
+OPTION_COLUMNS = ['option1', 'option2', 'option3', 'option4']
+CHOICE_TYPES = ('single-choice', 'multiple-choice')
+QUESTION_TYPES = CHOICE_TYPES + ('short-answer',)
+
+IMPORT_BATCH_SIZE = 1000
+MAX_STORED_ERRORS = 200
+
+class QuestionImportError(ValueError):
+    """Raised when an uploaded question bank cannot be read at all."""
+
+class ImportReport:
+    """Outcome of a question import: how many rows were inserted and why others were skipped."""
+
+    def __init__(self, inserted=0, errors=None):
+        self.inserted = inserted
+        self.errors = errors or []  # (sheet row number, message)
+        self.failure = None  # the exception that stopped the run, if any
+
+    def merge(self, other):
+        self.inserted += other.inserted
+        self.errors.extend(other.errors)
+
+def _file_kind(file):
+    filename = (file.filename or '').lower()
+    if filename.endswith('.csv'):
+        return 'csv'
+    if filename.endswith('.xlsx'):
+        return 'xlsx'
+    raise QuestionImportError('Please upload a .csv or .xlsx file.')
+
+def file_checksum(file):
+    """Hashes an uploaded file in fixed-size blocks and rewinds it."""
+    digest = hashlib.sha256()
+    for block in iter(lambda: file.stream.read(1024 * 1024), b''):
+        digest.update(block)
+    file.stream.seek(0)
+    return digest.hexdigest()
+
+def _iter_xlsx_rows(stream, skip_rows):
+    workbook = openpyxl.load_workbook(stream, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = ['' if h is None else str(h) for h in header]
+        yield columns
+        for i, row in enumerate(rows):
+            if i >= skip_rows:
+                row = (list(row) + [None] * len(columns))[:len(columns)]
+                yield ['' if value is None else str(value) for value in row]
+    finally:
+        workbook.close()
+
+def iter_question_chunks(file, chunk_size=IMPORT_BATCH_SIZE, skip_rows=0):
+    """Yields (data row offset, DataFrame of at most chunk_size rows) from an uploaded sheet.
+
+    CSV files are read with pandas' chunked reader and XLSX files with openpyxl's
+    read-only row iterator, so memory use is bounded by chunk_size rather than file
+    size. The first skip_rows data rows are skipped, which lets a failed import resume.
+    They are counted as parsed records, not lines, since a quoted CSV cell may span lines.
+    """
+    kind = _file_kind(file)
+    offset = skip_rows
+    try:
+        if kind == 'csv':
+            to_skip = skip_rows
+            for chunk in pd.read_csv(file.stream, dtype=str, keep_default_na=False, chunksize=chunk_size):
+                if to_skip:
+                    skipped = min(to_skip, len(chunk))
+                    chunk = chunk.iloc[skipped:]
+                    to_skip -= skipped
+                    if chunk.empty:
+                        continue
+                yield offset, chunk.reset_index(drop=True)
+                offset += len(chunk)
+            return
+
+        rows = _iter_xlsx_rows(file.stream, skip_rows)
+        columns = next(rows, None)
+        if columns is None:
+            return
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == chunk_size:
+                yield offset, pd.DataFrame(batch, columns=columns)
+                offset += len(batch)
+                batch = []
+        if batch:
+            yield offset, pd.DataFrame(batch, columns=columns)
+    except QuestionImportError:
+        raise
+    except Exception as e:
+        raise QuestionImportError(f'Could not read row {offset + 2} onwards: {e}')
+
+def prepare_questions(df, exam_id, first_row=2):
+    """Validates and normalizes a question sheet with column-wise pandas operations.
+
+    Returns (records ready for a bulk insert, [(row number, message)] for rejected rows).
+    `first_row` is the spreadsheet row number of the first data row.
+    """
+    df = df.rename(columns=lambda c: str(c).strip().lower())
+    missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+    if missing:
+        raise QuestionImportError(f"Missing required column(s): {', '.join(missing)}.")
+    if df.empty:
+        return [], []
+
+    option_columns = [c for c in OPTION_COLUMNS if c in df.columns]
+    text_columns = REQUIRED_COLUMNS + option_columns
+    df = df[text_columns].fillna('').astype(str).apply(lambda column: column.str.strip())
+    df = df[(df != '').any(axis=1)]  # ignore completely blank rows
+    if df.empty:
+        return [], []
+    df['question_type'] = df['question_type'].str.lower()
+    row_numbers = pd.Series(df.index + first_row, index=df.index)
+
+    is_choice = df['question_type'].isin(CHOICE_TYPES)
+    if option_columns:
+        options = df[option_columns].where(df[option_columns] != '').stack().dropna()
+        option_lists = options.groupby(level=0).agg(list).reindex(df.index)
+    else:
+        option_lists = pd.Series([None] * len(df), index=df.index, dtype=object)
+    option_lists = option_lists.apply(lambda value: value if isinstance(value, list) else [])
+    option_counts = option_lists.str.len()
+
+    # Spreadsheets often turn option numbers into floats ("1.0"), so strip a trailing ".0".
+    correct_lists = df['correct_answer'].str.replace(' ', '', regex=False)\
+        .str.replace(r'\.0+(?=,|$)', '', regex=True).str.split(',')
+    correct_lists = correct_lists.apply(lambda values: [v for v in values if v])
+    exploded = correct_lists[is_choice].explode().dropna()
+    numeric = exploded.str.fullmatch(r'\d+')
+    in_range = numeric & (pd.to_numeric(exploded.where(numeric), errors='coerce') < option_counts.reindex(exploded.index))
+    bad_index = (~in_range).groupby(level=0).any().reindex(df.index, fill_value=False)
+
+    checks = [
+        (df['question_text'] == '', 'question_text is empty'),
+        (~df['question_type'].isin(QUESTION_TYPES), "question_type must be one of " + ', '.join(QUESTION_TYPES)),
+        (df['correct_answer'] == '', 'correct_answer is empty'),
+        (is_choice & (option_counts < 2), 'choice questions need at least two options'),
+        (is_choice & bad_index, 'correct_answer must list option numbers starting at 0 for option1'),
+        ((df['question_type'] == 'single-choice') & (correct_lists.str.len() > 1),
+         'single-choice questions take exactly one correct option'),
+    ]
+    messages = pd.Series([[] for _ in range(len(df))], index=df.index, dtype=object)
+    for mask, message in checks:
+        for index in mask[mask].index:
+            messages[index].append(message)
+    invalid = messages.str.len() > 0
+
+    errors = [(int(row_numbers[i]), '; '.join(messages[i])) for i in df.index[invalid]]
+
+    valid = df[~invalid]
+    records = []
+    for question_text, question_type, correct_answer, opts, correct in zip(
+            valid['question_text'], valid['question_type'], valid['correct_answer'],
+            option_lists[~invalid], correct_lists[~invalid]):
+        if question_type in CHOICE_TYPES:
+            correct_set = set(correct)
+            records.append({
+                'exam_id': exam_id,
+                'question_text': question_text,
+                'question_type': question_type,
+                'options': [{'text': text, 'correct': str(i) in correct_set} for i, text in enumerate(opts)],
+                'correct_answer': correct,
+            })
+        else:
+            records.append({
+                'exam_id': exam_id,
+                'question_text': question_text,
+                'question_type': question_type,
+                'options': None,
+                'correct_answer': correct_answer,
+            })
+    return records, errors
+
+def insert_questions(records):
+    """Inserts prepared question records with a single bulk INSERT."""
+    if records:
+        db.session.execute(insert(Question), records)
+    return len(records)
+
+def _find_resumable_import(exam_id, checksum):
+    return QuestionImport.query.filter(
+        QuestionImport.exam_id == exam_id,
+        QuestionImport.checksum == checksum,
+        QuestionImport.status != 'completed'
+    ).order_by(QuestionImport.id.desc()).first()
+
+def import_questions(file, exam_id, batch_size=IMPORT_BATCH_SIZE):
+    """Streams an uploaded question bank into the exam in committed batches.
+
+    Progress is stored on a QuestionImport row after every batch. If a batch fails the
+    import is marked failed, and uploading the same file again resumes after the last
+    committed row instead of duplicating questions. Returns (QuestionImport, ImportReport)
+    covering this run; the returned import row is committed.
+    """
+    _file_kind(file)
+    checksum = file_checksum(file)
+    job = _find_resumable_import(exam_id, checksum)
+    if job is None:
+        job = QuestionImport(exam_id=exam_id, filename=file.filename[:255], checksum=checksum,
+                             rows_processed=0, inserted=0, error_count=0, errors=[])
+        db.session.add(job)
+    job.status = 'running'
+    job.message = None
+    db.session.commit()
+
+    report = ImportReport()
+    try:
+        for offset, chunk in iter_question_chunks(file, batch_size, skip_rows=job.rows_processed):
+            records, errors = prepare_questions(chunk, exam_id, first_row=offset + 2)
+            inserted = insert_questions(records)
+            job.rows_processed = offset + len(chunk)
+            job.inserted += inserted
+            job.error_count += len(errors)
+            stored = list(job.errors or [])
+            job.errors = stored + [list(e) for e in errors[:max(0, MAX_STORED_ERRORS - len(stored))]]
+            job.updated_at = datetime.now(pytz.utc)
+            db.session.commit()
+            report.merge(ImportReport(inserted, errors))
+    except Exception as e:
+        db.session.rollback()
+        report.failure = e
+        job.status = 'failed'
+        job.message = str(e) if isinstance(e, QuestionImportError) else f'Import stopped unexpectedly: {e}'
+        job.updated_at = datetime.now(pytz.utc)
+        db.session.commit()
+        return job, report
+
+    job.status = 'completed'
+    job.updated_at = datetime.now(pytz.utc)
+    db.session.commit()
+    return job, report
@@ -0,0 +1,66 @@
+import glob
+import hashlib
+import os
+import tempfile
+from flask import current_app
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from .models import db, User, ExamSubmission, ExamStats
+from .analytics import get_exam_analytics
+
+def _report_version(exam):
+    """Identifies the current state of an exam's results.
+
+    exam_stats.updated_at moves on every submission and on regrades; exams without
+    stats fall back to the latest submission time. The submission count, the exam
+    title and a database-side hash of the names of the students in the report are
+    included so that changing any of them, e.g. renaming a student, also produces a
+    new report.
+    """
+    stats = db.session.get(ExamStats, exam.id)
+    if stats is not None:
+        stamp, count = stats.updated_at, stats.submission_count
+    else:
+        stamp, count = db.session.query(db.func.max(ExamSubmission.end_time), db.func.count(ExamSubmission.id))\
+            .filter(ExamSubmission.exam_id == exam.id, ExamSubmission.status == 'submitted').one()
+    names = db.session.query(
+        db.func.md5(db.func.string_agg(User.fullname, aggregate_order_by(db.literal('\x1f'), ExamSubmission.id)))
+    ).join(ExamSubmission, ExamSubmission.student_id == User.id)\
+        .filter(ExamSubmission.exam_id == exam.id, ExamSubmission.status == 'submitted').scalar()
+    key = f"{stamp.isoformat() if stamp else 'none'}|{count}|{exam.title}|{names or ''}"
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+def _cache_folder():
+    folder = current_app.config['REPORT_CACHE_FOLDER']
+    os.makedirs(folder, exist_ok=True)
+    return folder
+
+def invalidate_results_report(exam_id, keep=None):
+    """Deletes the cached PDF reports of an exam, e.g. after its questions change, except the one at `keep`."""
+    for path in glob.glob(os.path.join(_cache_folder(), f'results_{exam_id}_*.pdf')):
+        if path == keep:
+            continue
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+def get_results_report(exam):
+    """Returns the path of the exam's results PDF, building it only if the results have changed."""
+    folder = _cache_folder()
+    path = os.path.join(folder, f'results_{exam.id}_{_report_version(exam)}.pdf')
+    if os.path.exists(path):
+        return path
+
+    from .results_pdf import build_results_pdf  # fpdf is only loaded once a report is built
+    pdf = build_results_pdf(exam, get_exam_analytics(exam.id))
+    fd, tmp_path = tempfile.mkstemp(dir=folder, suffix='.tmp')
+    os.close(fd)
+    try:
+        pdf.output(tmp_path, 'F')
+        os.replace(tmp_path, path)  # atomic, so concurrent downloads never see a partial file
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    # Only older versions go; another request may be about to send this one.
+    invalidate_results_report(exam.id, keep=path)
+    return path
@@ -0,0 +1,108 @@
+import unicodedata
+from fpdf import FPDF
+from flask import current_app
+from .exports import format_time_taken
+
+RESULT_COLUMNS = [('Student', 50), ('Score', 20), ('Answered', 22), ('Correct', 20), ('Incorrect', 22),
+                  ('Unanswered', 24), ('Time Taken', 32)]
+QUESTION_COLUMNS = [('#', 10), ('Question', 120), ('Correct', 20), ('Incorrect', 20), ('% Correct', 20)]
+ROW_HEIGHT = 8
+# The core PDF fonts are latin-1 only; map common typographic punctuation to ASCII.
+PUNCTUATION = str.maketrans({'\u2018': "'", '\u2019': "'", '\u201c': '"', '\u201d': '"',
+                             '\u2013': '-', '\u2014': '-', '\u2026': '...'})
+
+def _to_latin1(char):
+    if ord(char) < 256:
+        return char
+    base = ''.join(c for c in unicodedata.normalize('NFKD', char) if not unicodedata.combining(c))
+    return base.encode('latin-1', 'replace').decode('latin-1')
+
+class ResultsPDF(FPDF):
+    """FPDF with page numbers and tables whose header row repeats on every page."""
+
+    def __init__(self, unicode_font=None):
+        super().__init__()
+        self.font_family_name = 'Arial'
+        self.unicode = bool(unicode_font)
+        if unicode_font:
+            self.add_font('ReportFont', '', unicode_font, uni=True)
+            self.add_font('ReportFont', 'B', unicode_font, uni=True)
+            self.font_family_name = 'ReportFont'
+        self.set_auto_page_break(True, margin=15)
+        self.alias_nb_pages()
+
+    def printable(self, value):
+        """Makes text printable: unchanged with a Unicode font, otherwise folded to latin-1."""
+        value = '' if value is None else str(value)
+        if self.unicode:
+            return value
+        return ''.join(_to_latin1(c) for c in value.translate(PUNCTUATION))
+
+    def fit(self, value, width):
+        """Shortens text with an ellipsis so that it fits a cell of the given width."""
+        value = self.printable(value)
+        if self.get_string_width(value) <= width - 2:
+            return value
+        # Binary search for the longest prefix that still fits with the ellipsis.
+        low, high = 0, len(value) - 1
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.get_string_width(value[:middle] + '...') <= width - 2:
+                low = middle
+            else:
+                high = middle - 1
+        return value[:low] + '...'
+
+    def footer(self):
+        self.set_y(-12)
+        self.set_font(self.font_family_name, '', 8)
+        self.cell(0, 8, f'Page {self.page_no()} of {{nb}}', 0, 0, 'C')
+
+    def table(self, columns, rows):
+        def header():
+            self.set_font(self.font_family_name, 'B', 10)
+            for title, width in columns:
+                self.cell(width, ROW_HEIGHT, title, 1, 0, 'C')
+            self.ln()
+            self.set_font(self.font_family_name, '', 9)
+
+        header()
+        for row in rows:
+            if self.get_y() + ROW_HEIGHT > self.page_break_trigger:
+                self.add_page()
+                header()
+            for (title, width), value in zip(columns, row):
+                self.cell(width, ROW_HEIGHT, self.fit(value, width), 1)
+            self.ln()
+
+def build_results_pdf(exam, analytics):
+    """Lays out the student results table followed by the per-question analysis."""
+    pdf = ResultsPDF(current_app.config.get('PDF_UNICODE_FONT'))
+    pdf.add_page()
+    pdf.set_font(pdf.font_family_name, 'B', 14)
+    pdf.cell(0, 10, pdf.fit(f'Exam Results: {exam.title}', 190), 0, 1, 'C')
+
+    submissions = analytics['submissions']
+    pdf.set_font(pdf.font_family_name, '', 10)
+    pdf.cell(0, 7, f"Submissions: {len(submissions)}    Average score: {analytics['average_score']:.2f}%", 0, 1)
+    pdf.ln(2)
+
+    pdf.table(RESULT_COLUMNS, (
+        [sub['fullname'], f"{sub['score'] or 0:.2f}%", sub['answered_questions'], sub['correct_answers'],
+         sub['incorrect_answers'], sub['unanswered_questions'], format_time_taken(sub['time_taken'])]
+        for sub in submissions
+    ))
+
+    pdf.ln(6)
+    if pdf.get_y() + 3 * ROW_HEIGHT > pdf.page_break_trigger:
+        pdf.add_page()
+    pdf.set_font(pdf.font_family_name, 'B', 12)
+    pdf.cell(0, 10, 'Question Analysis', 0, 1)
+
+    def question_rows():
+        for number, question in enumerate(analytics['question_analysis'], start=1):
+            answered = question['correct_count'] + question['incorrect_count']
+            rate = f"{question['correct_count'] / answered * 100:.1f}%" if answered else '-'
+            yield [number, question['question_text'], question['correct_count'], question['incorrect_count'], rate]
+    pdf.table(QUESTION_COLUMNS, question_rows())
+    return pdf
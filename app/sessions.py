@@ -0,0 +1,215 @@
+import secrets
+from abc import ABC, abstractmethod
+import signal
+import time
+from datetime import datetime, timedelta
+import pytz
+from flask import current_app, request, session
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SessionMixin
+from itsdangerous import BadSignature, Signer
+from sqlalchemy import create_engine, delete, insert, select, update
+from werkzeug.datastructures import CallbackDict
+from .models import db, ServerSession
+
+# Requests that never touch the session cookie.
+SESSION_SKIP_ENDPOINTS = {'static'}
+# Frequent background requests from the exam page. They only refresh a session
+# about to expire, so that a long exam does not log the student out.
+SESSION_QUIET_ENDPOINTS = {'student.save_answer', 'student.save_answers_batch'}
+QUIET_REFRESH_MARGIN = timedelta(minutes=5)
+# Keys added to every session by refresh_session() and Flask-Login. A session holding
+# nothing else belongs to an anonymous visitor and is neither stored nor sent.
+HOUSEKEEPING_KEYS = {'_permanent', '_refreshed_at', '_fresh'}
+
+def has_session_data(session):
+    return any(key not in HOUSEKEEPING_KEYS for key in session)
+
+def refresh_session():
+    """Keeps the session alive with a sliding expiry without re-sending the cookie on every request.
+
+    The cookie is only rewritten once SESSION_REFRESH_FRACTION of
+    PERMANENT_SESSION_LIFETIME has passed since it was last issued. Anonymous
+    visitors without session data get no cookie at all.
+    """
+    if request.endpoint in SESSION_SKIP_ENDPOINTS or not has_session_data(session):
+        return
+    if not session.permanent:
+        session.permanent = True
+    lifetime = current_app.permanent_session_lifetime
+    refresh_after = lifetime * current_app.config['SESSION_REFRESH_FRACTION']
+    if request.endpoint in SESSION_QUIET_ENDPOINTS:
+        refresh_after = max(refresh_after, lifetime - QUIET_REFRESH_MARGIN)
+    now = int(time.time())
+    if now - session.get('_refreshed_at', 0) >= refresh_after.total_seconds():
+        session['_refreshed_at'] = now
+
+class SessionStore(ABC):
+    """Where server-side sessions are kept. Session data is passed in and out already serialized."""
+
+    @abstractmethod
+    def load(self, sid):
+        """Returns (data, user_id) of an unexpired session, or None."""
+
+    @abstractmethod
+    def save(self, sid, data, user_id, expires_at):
+        """Stores a session, replacing any earlier data under the same id."""
+
+    @abstractmethod
+    def delete(self, sid):
+        """Deletes one session; unknown ids are ignored."""
+
+    @abstractmethod
+    def delete_user(self, user_id):
+        """Deletes every session of a user, logging them out everywhere."""
+
+    @abstractmethod
+    def purge(self):
+        """Deletes expired sessions and returns how many there were."""
+
+class DatabaseSessionStore(SessionStore):
+    """Keeps sessions in the `sessions` table of the app database, or of the database at `url`.
+
+    A separate URL such as sqlite:///instance/sessions.db gives a local store
+    whose table is created on first use. Statements run on their own connection,
+    so saving a session never commits or rolls back the request's db.session.
+    """
+
+    def __init__(self, url=None):
+        self.table = ServerSession.__table__
+        self._engine = None
+        if url:
+            self._engine = create_engine(url)
+            self.table.create(self._engine, checkfirst=True)
+
+    @property
+    def engine(self):
+        return self._engine or db.engine
+
+    def load(self, sid):
+        with self.engine.connect() as conn:
+            row = conn.execute(select(self.table.c.data, self.table.c.user_id)
+                               .where(self.table.c.id == sid, self.table.c.expires_at > datetime.now(pytz.utc))).first()
+        return tuple(row) if row else None
+
+    def save(self, sid, data, user_id, expires_at):
+        values = {'data': data, 'user_id': user_id, 'expires_at': expires_at}
+        with self.engine.begin() as conn:
+            if not conn.execute(update(self.table).where(self.table.c.id == sid).values(**values)).rowcount:
+                conn.execute(insert(self.table).values(id=sid, **values))
+
+    def delete(self, sid):
+        with self.engine.begin() as conn:
+            conn.execute(delete(self.table).where(self.table.c.id == sid))
+
+    def delete_user(self, user_id):
+        with self.engine.begin() as conn:
+            conn.execute(delete(self.table).where(self.table.c.user_id == user_id))
+
+    def purge(self):
+        with self.engine.begin() as conn:
+            return conn.execute(delete(self.table).where(self.table.c.expires_at <= datetime.now(pytz.utc))).rowcount
+
+class StoredSession(CallbackDict, SessionMixin):
+    def __init__(self, initial=None, sid=None, user_id=None):
+        def on_update(self):
+            self.modified = True
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.user_id = user_id
+        self.modified = False
+
+class StoredSessionInterface(SessionInterface):
+    """Keeps session data in a SessionStore; the cookie only carries a signed session id.
+
+    A new id is issued whenever the logged-in user changes, and the server-side
+    expiry is enforced on load, so logging out or deleting a user ends the session
+    even if the browser still holds the cookie.
+    """
+    serializer = TaggedJSONSerializer()
+
+    def __init__(self, store):
+        self.store = store
+
+    def _signer(self, app):
+        return Signer(app.secret_key, salt='session-id')
+
+    def open_session(self, app, request):
+        cookie = request.cookies.get(self.get_cookie_name(app))
+        if not cookie:
+            return StoredSession()
+        try:
+            sid = self._signer(app).unsign(cookie).decode('ascii')
+        except BadSignature:
+            return StoredSession()
+        stored = self.store.load(sid)
+        if stored is None:
+            return StoredSession()
+        data, user_id = stored
+        return StoredSession(self.serializer.loads(data), sid, user_id)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        if not has_session_data(session):
+            if session.sid is not None:
+                self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+        if not self.should_set_cookie(app, session):
+            return
+
+        user_id = session.get('_user_id')
+        user_id = int(user_id) if user_id is not None else None
+        sid = session.sid
+        if sid is None or user_id != session.user_id:
+            if sid is not None:
+                self.store.delete(sid)
+            sid = secrets.token_urlsafe(32)
+        expires = self.get_expiration_time(app, session)
+        expires_at = expires or datetime.now(pytz.utc) + app.permanent_session_lifetime
+        self.store.save(sid, self.serializer.dumps(dict(session)), user_id, expires_at)
+        response.set_cookie(name, self._signer(app).sign(sid).decode('ascii'), expires=expires,
+                            httponly=self.get_cookie_httponly(app), domain=domain, path=path,
+                            secure=self.get_cookie_secure(app), samesite=self.get_cookie_samesite(app))
+        response.vary.add('Cookie')
+
+def init_sessions(app):
+    """Installs the server-side session interface unless SESSION_BACKEND is 'cookie'."""
+    backend = app.config['SESSION_BACKEND']
+    if backend == 'database':
+        app.session_interface = StoredSessionInterface(DatabaseSessionStore(app.config['SESSION_DATABASE_URL']))
+    elif backend != 'cookie':
+        raise ValueError(f'Unknown SESSION_BACKEND: {backend}')
+
+def revoke_user_sessions(user_id):
+    """Logs a user out of every browser; a no-op with cookie sessions."""
+    interface = current_app.session_interface
+    if isinstance(interface, StoredSessionInterface):
+        interface.store.delete_user(user_id)
+
+def run_session_purger(interval=300.0, once=False):
+    """Deletes expired sessions every `interval` seconds until stopped. Returns the number deleted."""
+    interface = current_app.session_interface
+    if not isinstance(interface, StoredSessionInterface):
+        return 0
+    stopping = []
+    def stop(signum, frame):
+        stopping.append(signum)
+    previous = {sig: signal.signal(sig, stop) for sig in (signal.SIGTERM, signal.SIGINT)}
+
+    total = 0
+    try:
+        while not stopping:
+            purged = interface.store.purge()
+            if purged:
+                current_app.logger.info('Purged %d expired sessions.', purged)
+            total += purged
+            if once:
+                break
+            time.sleep(interval)
+    finally:
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
+    return total
@@ -0,0 +1,129 @@
+from collections import Counter, defaultdict
+from sqlalchemy import select, func, update
+from sqlalchemy.dialects.postgresql import insert
+from .models import db, Question, ExamSubmission, StudentAnswer, ExamStats, QuestionStats
+from .grading import get_answer_keys
+
+STATS_FETCH_BATCH = 2000
+
+_exam_stats = ExamStats.__table__
+_question_stats = QuestionStats.__table__
+
+EXAM_STAT_COLUMNS = ['exam_id', 'submission_count', 'score_sum', 'score_sq_sum', 'timed_count',
+                     'time_taken_sum', 'time_taken_min', 'time_taken_max', 'updated_at']
+
+def _exam_aggregates(*criteria):
+    """Aggregates submitted attempts per exam, in the column order of EXAM_STAT_COLUMNS."""
+    score = func.coalesce(ExamSubmission.score, 0)
+    time_taken = func.extract('epoch', ExamSubmission.end_time - ExamSubmission.start_time)
+    return select(
+        ExamSubmission.exam_id,
+        func.count(ExamSubmission.id),
+        func.sum(score),
+        func.sum(score * score),
+        func.count(time_taken),
+        func.coalesce(func.sum(time_taken), 0),
+        func.min(time_taken),
+        func.max(time_taken),
+        func.now()
+    ).where(ExamSubmission.status == 'submitted', *criteria).group_by(ExamSubmission.exam_id)
+
+def _upsert_question_stats(counts):
+    """Adds (exam_id, correct, incorrect) deltas keyed by question_id to question_stats."""
+    if not counts:
+        return
+    stmt = insert(_question_stats).values([
+        {'question_id': question_id, 'exam_id': exam_id, 'correct_count': correct, 'incorrect_count': incorrect}
+        for question_id, (exam_id, correct, incorrect) in sorted(counts.items())
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[_question_stats.c.question_id],
+        set_={
+            'correct_count': _question_stats.c.correct_count + stmt.excluded.correct_count,
+            'incorrect_count': _question_stats.c.incorrect_count + stmt.excluded.incorrect_count,
+        }
+    )
+    db.session.execute(stmt)
+
+def record_submissions(submissions, outcomes):
+    """Adds newly finalized submissions to exam_stats and question_stats.
+
+    `outcomes` is the submission_id -> {question_id: is_correct} map returned by
+    grade_submissions. Runs in the caller's transaction; the upserts make concurrent
+    submits of the same exam add up instead of overwriting each other.
+    """
+    ids = [s.id for s in submissions]
+    if not ids:
+        return
+    db.session.flush()
+
+    stmt = insert(_exam_stats).from_select(EXAM_STAT_COLUMNS, _exam_aggregates(ExamSubmission.id.in_(ids)))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[_exam_stats.c.exam_id],
+        set_={
+            'submission_count': _exam_stats.c.submission_count + stmt.excluded.submission_count,
+            'score_sum': _exam_stats.c.score_sum + stmt.excluded.score_sum,
+            'score_sq_sum': _exam_stats.c.score_sq_sum + stmt.excluded.score_sq_sum,
+            'timed_count': _exam_stats.c.timed_count + stmt.excluded.timed_count,
+            'time_taken_sum': _exam_stats.c.time_taken_sum + stmt.excluded.time_taken_sum,
+            'time_taken_min': func.least(_exam_stats.c.time_taken_min, stmt.excluded.time_taken_min),
+            'time_taken_max': func.greatest(_exam_stats.c.time_taken_max, stmt.excluded.time_taken_max),
+            'updated_at': stmt.excluded.updated_at,
+        }
+    )
+    db.session.execute(stmt)
+
+    counts = {}
+    for submission in submissions:
+        for question_id, is_correct in outcomes.get(submission.id, {}).items():
+            exam_id, correct, incorrect = counts.get(question_id, (submission.exam_id, 0, 0))
+            counts[question_id] = (exam_id, correct + is_correct, incorrect + (not is_correct))
+    _upsert_question_stats(counts)
+
+def rebuild_exam_stats(exam_ids=None):
+    """Recomputes the statistics of the given exams (or of all exams) from raw answers.
+
+    Also backfills answered_count and correct_count on each submitted attempt, without
+    touching scores. Returns the number of submissions that were recounted.
+    """
+    exam_filter = [ExamSubmission.exam_id.in_(exam_ids)] if exam_ids is not None else []
+
+    if exam_ids is None:
+        db.session.execute(_question_stats.delete())
+        db.session.execute(_exam_stats.delete())
+    else:
+        db.session.execute(_question_stats.delete().where(_question_stats.c.exam_id.in_(exam_ids)))
+        db.session.execute(_exam_stats.delete().where(_exam_stats.c.exam_id.in_(exam_ids)))
+    db.session.execute(insert(_exam_stats).from_select(EXAM_STAT_COLUMNS, _exam_aggregates(*exam_filter)))
+
+    submission_exams = dict(db.session.execute(
+        select(ExamSubmission.id, ExamSubmission.exam_id).where(ExamSubmission.status == 'submitted', *exam_filter)
+    ).all())
+    keys = get_answer_keys(set(submission_exams.values()))
+    question_exams = dict(db.session.execute(
+        select(Question.id, Question.exam_id).where(Question.exam_id.in_(list(keys)))
+    ).all())
+
+    answered = Counter()
+    correct = Counter()
+    question_counts = defaultdict(lambda: [0, 0])
+    answers = db.session.query(StudentAnswer.submission_id, StudentAnswer.question_id, StudentAnswer.answer_text)\
+        .join(ExamSubmission, StudentAnswer.submission_id == ExamSubmission.id)\
+        .filter(ExamSubmission.status == 'submitted', *exam_filter)\
+        .yield_per(STATS_FETCH_BATCH)
+    for submission_id, question_id, answer_text in answers:
+        is_correct = keys[submission_exams[submission_id]].is_correct(question_id, answer_text)
+        answered[submission_id] += 1
+        correct[submission_id] += is_correct
+        question_counts[question_id][0 if is_correct else 1] += 1
+
+    if submission_exams:
+        db.session.execute(update(ExamSubmission), [
+            {'id': submission_id, 'answered_count': answered[submission_id], 'correct_count': correct[submission_id]}
+            for submission_id in submission_exams
+        ])
+    _upsert_question_stats({
+        question_id: (question_exams[question_id], right, wrong)
+        for question_id, (right, wrong) in question_counts.items() if question_id in question_exams
+    })
+    return len(submission_exams)
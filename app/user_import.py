@@ -0,0 +1,98 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from sqlalchemy.dialects.postgresql import insert
+from werkzeug.security import generate_password_hash
+from .models import db, User
+
+REQUIRED_COLUMNS = ['fullname', 'email', 'password', 'role', 'gender', 'class']
+ROLES = ('student', 'teacher', 'admin')
+INSERT_BATCH_SIZE = 1000
+# Below this many passwords the cost of starting worker processes outweighs the gain.
+PARALLEL_HASH_THRESHOLD = 50
+
+class UserImportError(ValueError):
+    """Raised when an uploaded user sheet cannot be read at all."""
+
+class UserImportSummary:
+    """Counts of created, skipped and failed rows from a bulk user import."""
+
+    def __init__(self):
+        self.created = 0
+        self.skipped = []  # (sheet row number, email)
+        self.failed = []   # (sheet row number, message)
+
+def hash_passwords(passwords, workers=None):
+    """Hashes passwords across a process pool; the hash is deliberately slow, so this is CPU bound."""
+    if len(passwords) < PARALLEL_HASH_THRESHOLD:
+        return [generate_password_hash(p) for p in passwords]
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(generate_password_hash, passwords, chunksize=max(1, len(passwords) // (workers * 4))))
+
+def read_user_sheet(file):
+    try:
+        df = pd.read_excel(file.stream, dtype=str, keep_default_na=False)
+    except Exception as e:
+        raise UserImportError(f'Could not read the file: {e}')
+    df = df.rename(columns=lambda c: str(c).strip().lower())
+    missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+    if missing:
+        raise UserImportError(f"Missing required column(s): {', '.join(missing)}.")
+    df = df[REQUIRED_COLUMNS].astype(str).apply(lambda column: column.str.strip())
+    df['role'] = df['role'].str.lower()
+    return df[(df != '').any(axis=1)]
+
+def _existing_emails(emails):
+    existing = set()
+    for start in range(0, len(emails), INSERT_BATCH_SIZE):
+        batch = emails[start:start + INSERT_BATCH_SIZE]
+        existing.update(email for (email,) in db.session.query(User.email).filter(User.email.in_(batch)))
+    return existing
+
+def import_users(file, hash_workers=None):
+    """Creates users from an uploaded .xlsx sheet. The caller commits.
+
+    Existing emails are looked up with batched IN queries, passwords are hashed in
+    parallel and new users are written with bulk INSERTs that skip any email taken
+    concurrently.
+    """
+    df = read_user_sheet(file)
+    summary = UserImportSummary()
+    row_numbers = df.index + 2
+
+    failed = (df['fullname'] == '') | (df['email'] == '') | (df['password'] == '') | ~df['role'].isin(ROLES)
+    for row, fullname, email, password, role in zip(row_numbers[failed], df['fullname'][failed], df['email'][failed],
+                                                    df['password'][failed], df['role'][failed]):
+        problems = [name for name, value in (('fullname', fullname), ('email', email), ('password', password)) if not value]
+        message = f"missing {', '.join(problems)}" if problems else f"role must be one of {', '.join(ROLES)}"
+        summary.failed.append((int(row), message))
+
+    candidates = df[~failed]
+    candidate_rows = row_numbers[~failed]
+    existing = _existing_emails(candidates['email'].unique().tolist())
+    duplicate = candidates['email'].isin(existing) | candidates['email'].duplicated()
+    summary.skipped.extend(zip(candidate_rows[duplicate].tolist(), candidates['email'][duplicate]))
+
+    new_users = candidates[~duplicate]
+    new_rows = candidate_rows[~duplicate]
+    hashes = hash_passwords(new_users['password'].tolist(), hash_workers)
+    records = [{
+        'fullname': fullname,
+        'email': email,
+        'password_hash': password_hash,
+        'role': role,
+        'gender': gender or None,
+        'class': class_ or None,
+    } for fullname, email, password_hash, role, gender, class_ in zip(
+        new_users['fullname'], new_users['email'], hashes, new_users['role'], new_users['gender'], new_users['class'])]
+
+    users = User.__table__
+    created = set()
+    for start in range(0, len(records), INSERT_BATCH_SIZE):
+        stmt = insert(users).values(records[start:start + INSERT_BATCH_SIZE])\
+            .on_conflict_do_nothing(index_elements=[users.c.email]).returning(users.c.email)
+        created.update(db.session.execute(stmt).scalars())
+    summary.created = len(created)
+    summary.skipped.extend((int(row), email) for row, email in zip(new_rows, new_users['email']) if email not in created)
+    return summary
@@ -0,0 +1,17 @@
+"""Gunicorn settings, read automatically when gunicorn starts from the project root."""
+import os
+import shutil
+import tempfile
+
+# Workers write their metrics here so /metrics can report totals for all of them.
+# Each gunicorn master (e.g. each pool in documentation section 3.3) gets its own directory.
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), f'cbt-metrics-{os.getpid()}'))
+
+def on_starting(server):
+    directory = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(directory, ignore_errors=True)  # never add up a previous run's counters
+    os.makedirs(directory)
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
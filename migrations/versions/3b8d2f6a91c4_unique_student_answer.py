@@ -0,0 +1,37 @@
+"""unique student answer per question
+
+Revision ID: 3b8d2f6a91c4
+Revises: 904e7ef30c04
+Create Date: 2026-10-17 09:12:05.418230
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b8d2f6a91c4'
+down_revision = '904e7ef30c04'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keep only the most recent answer for each (submission, question) pair
+    # before the unique constraint is added.
+    op.execute("""
+        DELETE FROM student_answers a
+        USING student_answers b
+        WHERE a.submission_id = b.submission_id
+          AND a.question_id = b.question_id
+          AND a.id < b.id
+    """)
+    op.create_unique_constraint(
+        'uq_student_answers_submission_question',
+        'student_answers',
+        ['submission_id', 'question_id']
+    )
+
+
+def downgrade():
+    op.drop_constraint('uq_student_answers_submission_question', 'student_answers', type_='unique')
@@ -0,0 +1,42 @@
+"""question import progress
+
+Revision ID: 5d2a8c3f6e10
+Revises: c41e9b07d2f8
+Create Date: 2026-10-17 13:48:19.660412
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '5d2a8c3f6e10'
+down_revision = 'c41e9b07d2f8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('question_imports',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('exam_id', sa.Integer(), nullable=False),
+    sa.Column('filename', sa.String(length=255), nullable=False),
+    sa.Column('checksum', sa.String(length=64), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('rows_processed', sa.Integer(), nullable=False),
+    sa.Column('inserted', sa.Integer(), nullable=False),
+    sa.Column('error_count', sa.Integer(), nullable=False),
+    sa.Column('errors', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('message', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['exam_id'], ['exams.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_question_imports_exam_id', 'question_imports', ['exam_id'])
+
+
+def downgrade():
+    op.drop_index('ix_question_imports_exam_id', table_name='question_imports')
+    op.drop_table('question_imports')
@@ -0,0 +1,47 @@
+"""add indexes for hot query predicates
+
+Revision ID: 7e4c0a9d5b21
+Revises: 3b8d2f6a91c4
+Create Date: 2026-10-17 10:03:41.227815
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7e4c0a9d5b21'
+down_revision = '3b8d2f6a91c4'
+branch_labels = None
+depends_on = None
+
+# student_answers(submission_id) is served by the leading column of
+# uq_student_answers_submission_question, and password reset lookups by the
+# unique index on password_reset_tokens.token, so neither needs a new index.
+INDEXES = [
+    ('ix_exam_submissions_exam_status', 'exam_submissions', ['exam_id', 'status'], None),
+    ('ix_exam_submissions_student_exam', 'exam_submissions', ['student_id', 'exam_id'], None),
+    ('ix_exam_submissions_submitted_end_time', 'exam_submissions', ['exam_id', 'end_time'], "status = 'submitted'"),
+    ('ix_student_answers_question_id', 'student_answers', ['question_id'], None),
+    ('ix_questions_exam_id', 'questions', ['exam_id'], None),
+    ('ix_exams_teacher_created_at', 'exams', ['teacher_id', 'created_at'], None),
+    ('ix_users_role_class', 'users', ['role', 'class'], None),
+]
+
+
+def upgrade():
+    # Build the indexes without blocking writes on a live database.
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name, table, columns,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(where) if where else None,
+                if_not_exists=True
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,34 @@
+"""server-side sessions
+
+Revision ID: a5c8e2d71f39
+Revises: f4a7c2e9d815
+Create Date: 2026-10-17 18:03:45.217604
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a5c8e2d71f39'
+down_revision = 'f4a7c2e9d815'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('sessions',
+    sa.Column('id', sa.String(length=64), nullable=False),
+    sa.Column('data', sa.Text(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_sessions_user_id', 'sessions', ['user_id'])
+    op.create_index('ix_sessions_expires_at', 'sessions', ['expires_at'])
+
+
+def downgrade():
+    op.drop_index('ix_sessions_expires_at', table_name='sessions')
+    op.drop_index('ix_sessions_user_id', table_name='sessions')
+    op.drop_table('sessions')
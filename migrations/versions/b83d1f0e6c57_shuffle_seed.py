@@ -0,0 +1,26 @@
+"""per-submission shuffle seed and option randomization
+
+Revision ID: b83d1f0e6c57
+Revises: e27b5c9d4a13
+Create Date: 2026-10-17 16:37:52.104733
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b83d1f0e6c57'
+down_revision = 'e27b5c9d4a13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('exams', sa.Column('randomize_options', sa.Boolean(), server_default=sa.false(), nullable=False))
+    op.add_column('exam_submissions', sa.Column('shuffle_seed', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('exam_submissions', 'shuffle_seed')
+    op.drop_column('exams', 'randomize_options')
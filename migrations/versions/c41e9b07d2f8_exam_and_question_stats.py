@@ -0,0 +1,71 @@
+"""exam and question statistics
+
+Revision ID: c41e9b07d2f8
+Revises: 7e4c0a9d5b21
+Create Date: 2026-10-17 11:26:52.903144
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41e9b07d2f8'
+down_revision = '7e4c0a9d5b21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('exam_stats',
+    sa.Column('exam_id', sa.Integer(), nullable=False),
+    sa.Column('submission_count', sa.Integer(), nullable=False),
+    sa.Column('score_sum', sa.Float(), nullable=False),
+    sa.Column('score_sq_sum', sa.Float(), nullable=False),
+    sa.Column('timed_count', sa.Integer(), nullable=False),
+    sa.Column('time_taken_sum', sa.Float(), nullable=False),
+    sa.Column('time_taken_min', sa.Float(), nullable=True),
+    sa.Column('time_taken_max', sa.Float(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['exam_id'], ['exams.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('exam_id')
+    )
+    op.create_table('question_stats',
+    sa.Column('question_id', sa.Integer(), nullable=False),
+    sa.Column('exam_id', sa.Integer(), nullable=False),
+    sa.Column('correct_count', sa.Integer(), nullable=False),
+    sa.Column('incorrect_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['exam_id'], ['exams.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['question_id'], ['questions.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('question_id')
+    )
+    op.create_index('ix_question_stats_exam_id', 'question_stats', ['exam_id'])
+    op.add_column('exam_submissions', sa.Column('answered_count', sa.Integer(), nullable=True))
+    op.add_column('exam_submissions', sa.Column('correct_count', sa.Integer(), nullable=True))
+
+    # Exam-level aggregates can be filled in SQL. Per-question and per-submission
+    # counts need the grading rules; run `flask rebuild-stats` after upgrading.
+    op.execute("""
+        INSERT INTO exam_stats (exam_id, submission_count, score_sum, score_sq_sum, timed_count,
+                                time_taken_sum, time_taken_min, time_taken_max, updated_at)
+        SELECT exam_id,
+               count(id),
+               sum(coalesce(score, 0)),
+               sum(coalesce(score, 0) * coalesce(score, 0)),
+               count(EXTRACT(epoch FROM end_time - start_time)),
+               coalesce(sum(EXTRACT(epoch FROM end_time - start_time)), 0),
+               min(EXTRACT(epoch FROM end_time - start_time)),
+               max(EXTRACT(epoch FROM end_time - start_time)),
+               now()
+        FROM exam_submissions
+        WHERE status = 'submitted'
+        GROUP BY exam_id
+    """)
+
+
+def downgrade():
+    op.drop_column('exam_submissions', 'correct_count')
+    op.drop_column('exam_submissions', 'answered_count')
+    op.drop_index('ix_question_stats_exam_id', table_name='question_stats')
+    op.drop_table('question_stats')
+    op.drop_table('exam_stats')
@@ -0,0 +1,30 @@
+"""job uploads stored in the database
+
+Revision ID: d6f1a3b8c502
+Revises: a5c8e2d71f39
+Create Date: 2026-10-17 19:12:08.530417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd6f1a3b8c502'
+down_revision = 'a5c8e2d71f39'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('job_files',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('filename', sa.String(length=255), nullable=False),
+    sa.Column('data', sa.LargeBinary(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('job_files')
@@ -0,0 +1,34 @@
+"""partial index for the expired attempt sweeper
+
+Revision ID: f4a7c2e9d815
+Revises: b83d1f0e6c57
+Create Date: 2026-10-17 17:12:26.840159
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4a7c2e9d815'
+down_revision = 'b83d1f0e6c57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Only in-progress attempts are indexed, so the index stays small however many
+    # submitted attempts accumulate.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_exam_submissions_in_progress_start_time', 'exam_submissions', ['start_time'],
+            postgresql_concurrently=True,
+            postgresql_where=sa.text("status = 'in-progress'"),
+            if_not_exists=True
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_exam_submissions_in_progress_start_time', table_name='exam_submissions',
+                      postgresql_concurrently=True, if_exists=True)
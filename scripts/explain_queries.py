@@ -0,0 +1,147 @@
+"""Runs EXPLAIN on the queries the hot routes actually execute and checks that they use their indexes.
+
+Point DATABASE_URL at a disposable database that has been migrated, then run from
+the project root:
+
+    python -m scripts.explain_queries --seed
+
+Each check requests a route through the test client (or calls the helper a POST
+route relies on) while recording the SELECT statements it sends, then EXPLAINs
+those statements with their real parameters. Exits non-zero when an expected
+index does not appear in any of a route's plans.
+"""
+import argparse
+import json
+import sys
+from contextlib import contextmanager
+
+from sqlalchemy import event, select
+from sqlalchemy.engine import Engine
+
+from app import create_app
+from app.models import db, Exam, ExamSubmission
+from app.grading import grade_submissions
+from scripts.seed import seed
+
+app = create_app({'SESSION_BACKEND': 'cookie'})
+
+class StatementRecorder:
+    """Collects the SELECT statements sent to the database while recording."""
+
+    def __init__(self):
+        self.statements = None
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if self.statements is not None and statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+            self.statements.append((statement, parameters))
+
+    @contextmanager
+    def recording(self):
+        self.statements = []
+        try:
+            yield self.statements
+        finally:
+            self.statements = None
+
+def _sample_ids():
+    submission = db.session.execute(
+        select(ExamSubmission.id, ExamSubmission.student_id, ExamSubmission.exam_id, Exam.teacher_id)
+        .join(Exam, ExamSubmission.exam_id == Exam.id)
+        .where(ExamSubmission.status == 'submitted').limit(1)
+    ).first()
+    if submission is None:
+        sys.exit('No submitted exams found; run with --seed first.')
+    return submission._asdict()
+
+def _get(path, user_id=None):
+    client = app.test_client()
+    if user_id is not None:
+        with client.session_transaction() as session:
+            session['_user_id'] = str(user_id)
+            session['_fresh'] = True
+    response = client.get(path)
+    if response.status_code >= 400:
+        sys.exit(f'GET {path} returned {response.status_code}.')
+
+def _grade(submission_id):
+    with app.app_context():
+        grade_submissions([db.session.get(ExamSubmission, submission_id)])
+        db.session.rollback()
+
+def route_checks(ids):
+    """Returns (route, run, expected) tuples. `expected` lists sets of acceptable indexes; each set must be used."""
+    return [
+        ('student_dashboard', lambda: _get('/student/dashboard', ids['student_id']),
+         [{'ix_exam_submissions_student_exam'}]),
+        ('start_exam', lambda: _get(f"/student/exam/start/{ids['exam_id']}", ids['student_id']),
+         [{'ix_exam_submissions_student_exam'}, {'ix_questions_exam_id'}]),
+        ('submit_exam_route', lambda: _grade(ids['id']),
+         [{'uq_student_answers_submission_question'}, {'ix_questions_exam_id'}]),
+        ('teacher_analytics', lambda: _get(f"/teacher/analytics/{ids['exam_id']}", ids['teacher_id']),
+         [{'ix_exam_submissions_exam_status', 'ix_exam_submissions_submitted_end_time'}, {'ix_questions_exam_id'}]),
+        ('teacher_dashboard', lambda: _get('/teacher/dashboard', ids['teacher_id']),
+         [{'ix_exams_teacher_created_at'}, {'ix_users_role_class'}]),
+        ('reset_password', lambda: _get('/reset_password/no-such-token'),
+         [{'password_reset_tokens_token_key'}]),
+    ]
+
+def _plan_indexes(node, found):
+    if 'Index Name' in node:
+        found.add(node['Index Name'])
+    for child in node.get('Plans', []):
+        _plan_indexes(child, found)
+    return found
+
+def explain(statement, parameters):
+    connection = db.session.connection()
+    row = connection.exec_driver_sql('EXPLAIN (FORMAT JSON) ' + statement, parameters).scalar()
+    plan = (json.loads(row) if isinstance(row, str) else row)[0]['Plan']
+    return plan, _plan_indexes(plan, set())
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seed', action='store_true', help='seed synthetic data before explaining')
+    parser.add_argument('--no-seqscan', action='store_true',
+                        help='discourage sequential scans, useful when the seeded tables are small')
+    parser.add_argument('--verbose', action='store_true', help='print every statement and its JSON plan')
+    args = parser.parse_args()
+
+    with app.app_context():
+        if args.seed:
+            seed()
+        db.session.execute(db.text('ANALYZE'))
+        db.session.commit()
+        ids = _sample_ids()
+
+    recorder = StatementRecorder()
+    event.listen(Engine, 'before_cursor_execute', recorder)
+    recorded = []
+    for route, run, expected in route_checks(ids):
+        with recorder.recording() as statements:
+            run()
+        recorded.append((route, list(statements), expected))
+    event.remove(Engine, 'before_cursor_execute', recorder)
+
+    failures = 0
+    with app.app_context():
+        if args.no_seqscan:
+            db.session.execute(db.text('SET enable_seqscan = off'))
+        for route, statements, expected in recorded:
+            used = set()
+            for statement, parameters in statements:
+                plan, indexes = explain(statement, parameters)
+                used |= indexes
+                if args.verbose:
+                    print(statement)
+                    print(json.dumps(plan, indent=2))
+            missing = [' or '.join(sorted(names)) for names in expected if not names & used]
+            failures += bool(missing)
+            print(f"{'MISS' if missing else 'ok  '} {route:<20} {len(statements):>2} statements  "
+                  f"uses: {', '.join(sorted(used)) or '-'}" + (f"  missing: {'; '.join(missing)}" if missing else ''))
+        db.session.rollback()
+
+    if failures:
+        sys.exit(f'{failures} routes did not use their expected indexes.')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+"""Simulates an exam sitting against a local gunicorn and reports latency per endpoint.
+
+Seeds a fresh synthetic school into DATABASE_URL (use a disposable database), starts
+gunicorn on it unless --base-url is given, then has every seeded student log in, open
+the dashboard, start their class exam, save answers and submit. Run from the project root:
+
+    python -m scripts.loadtest --classes 4 --students 125 --questions 60 --concurrency 100 --workers 4
+"""
+import argparse
+import os
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from app import app
+from scripts.seed import seed
+
+SUBMISSION_ID_RE = re.compile(r'const submissionId = (\d+);')
+QUESTION_ID_RE = re.compile(r'name="answer_(\d+)"')
+
+class Recorder:
+    """Collects (endpoint, seconds, ok) samples from many threads."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def timed(self, endpoint, call):
+        start = time.perf_counter()
+        try:
+            response = call()
+            ok = response.status_code < 400
+        except requests.RequestException:
+            response, ok = None, False
+        elapsed = time.perf_counter() - start
+        with self.lock:
+            self.samples[endpoint].append(elapsed)
+            if not ok:
+                self.errors[endpoint] += 1
+        return response
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def run_student(base_url, email, password, exam_id, saves, batch, think, recorder, rng):
+    session = requests.Session()
+    recorder.timed('student_login', lambda: session.post(f'{base_url}/student/login',
+                                                         data={'email': email, 'password': password}, allow_redirects=False))
+    recorder.timed('student_dashboard', lambda: session.get(f'{base_url}/student/dashboard'))
+    page = recorder.timed('start_exam', lambda: session.get(f'{base_url}/student/exam/start/{exam_id}'))
+    if page is None or page.status_code != 200:
+        return
+    match = SUBMISSION_ID_RE.search(page.text)
+    question_ids = [int(q) for q in dict.fromkeys(QUESTION_ID_RE.findall(page.text))]
+    if not match or not question_ids:
+        return
+    submission_id = int(match.group(1))
+
+    pending = []
+    for i in range(saves):
+        question_id = question_ids[i % len(question_ids)]
+        answer = str(rng.randrange(4))
+        if batch:
+            pending.append({'question_id': question_id, 'answer_text': answer})
+            if len(pending) >= batch:
+                payload = {'submission_id': submission_id, 'answers': pending}
+                recorder.timed('save_answers', lambda: session.post(f'{base_url}/student/exam/save_answers', json=payload))
+                pending = []
+        else:
+            payload = {'submission_id': submission_id, 'question_id': question_id, 'answer_text': answer}
+            recorder.timed('save_answer', lambda: session.post(f'{base_url}/student/exam/save_answer', json=payload))
+        if think:
+            time.sleep(rng.uniform(0, 2 * think))
+    if pending:
+        payload = {'submission_id': submission_id, 'answers': pending}
+        recorder.timed('save_answers', lambda: session.post(f'{base_url}/student/exam/save_answers', json=payload))
+
+    recorder.timed('submit_exam_route', lambda: session.post(f'{base_url}/student/exam/submit',
+                                                             json={'submission_id': submission_id}))
+
+def start_gunicorn(port, workers, threads):
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--workers', str(workers), '--threads', str(threads),
+         '--bind', f'127.0.0.1:{port}', '--log-level', 'warning', 'app:create_app()'],
+        env=os.environ.copy()
+    )
+    base_url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            requests.get(base_url, timeout=1)
+            return process, base_url
+        except requests.RequestException:
+            if process.poll() is not None:
+                sys.exit('gunicorn exited during startup.')
+            time.sleep(0.2)
+    process.terminate()
+    sys.exit('gunicorn did not start within 30 seconds.')
+
+def report(recorder, wall_time):
+    print(f"\n{'endpoint':<20}{'requests':>9}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'req/s':>9}")
+    for endpoint, samples in sorted(recorder.samples.items()):
+        ordered = sorted(samples)
+        print(f'{endpoint:<20}{len(ordered):>9}{recorder.errors[endpoint]:>8}'
+              f'{percentile(ordered, 50) * 1000:>9.1f}{percentile(ordered, 95) * 1000:>9.1f}'
+              f'{percentile(ordered, 99) * 1000:>9.1f}{len(ordered) / wall_time:>9.1f}')
+    total = sum(len(s) for s in recorder.samples.values())
+    print(f'\n{total} requests in {wall_time:.1f}s ({total / wall_time:.1f} req/s overall)')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--classes', type=int, default=2)
+    parser.add_argument('--students', type=int, default=50, help='students per class')
+    parser.add_argument('--questions', type=int, default=40, help='questions per exam')
+    parser.add_argument('--saves', type=int, default=None, help='answer saves per student (default: one per question)')
+    parser.add_argument('--batch', type=int, default=0, help='send saves in batches of this size to save_answers')
+    parser.add_argument('--think', type=float, default=0.0, help='mean seconds between saves')
+    parser.add_argument('--concurrency', type=int, default=50, help='students active at once')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn worker processes')
+    parser.add_argument('--threads', type=int, default=1, help='gunicorn threads per worker')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--base-url', help='target an already running server instead of starting gunicorn')
+    parser.add_argument('--random-seed', type=int, default=1)
+    args = parser.parse_args()
+
+    with app.app_context():
+        school = seed(classes=args.classes, students_per_class=args.students, exams_per_class=1,
+                      questions_per_exam=args.questions, submitted_fraction=0, seed_value=args.random_seed)
+    print(f"Seeded {len(school['student_emails'])} students in {args.classes} classes (tag {school['tag']}).")
+
+    process = None
+    base_url = args.base_url
+    if not base_url:
+        process, base_url = start_gunicorn(args.port, args.workers, args.threads)
+
+    saves = args.saves if args.saves is not None else args.questions
+    recorder = Recorder()
+    rng = random.Random(args.random_seed)
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            futures = [
+                pool.submit(run_student, base_url, email, school['password'],
+                            school['exam_ids'][i // args.students], saves, args.batch, args.think,
+                            recorder, random.Random(rng.random()))
+                for i, email in enumerate(school['student_emails'])
+            ]
+            for future in futures:
+                future.result()
+    finally:
+        if process:
+            process.terminate()
+            process.wait()
+    report(recorder, time.perf_counter() - started)
+
+if __name__ == '__main__':
+    main()
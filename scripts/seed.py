@@ -0,0 +1,127 @@
+"""Seeds the configured database with synthetic classes, students, exams and answers.
+
+Used for query-plan checks and load tests. Run from the project root:
+
+    python -m scripts.seed --classes 5 --students 100 --exams 4 --questions 50
+"""
+import argparse
+import random
+import secrets
+from datetime import datetime
+
+import pytz
+from sqlalchemy import insert
+from werkzeug.security import generate_password_hash
+
+from app import app
+from app.models import db, User, Exam, Question, ExamSubmission, StudentAnswer
+from app.stats import rebuild_exam_stats
+
+SEED_PASSWORD = 'password'
+CHUNK_SIZE = 5000
+
+def _insert_returning_ids(model, rows):
+    ids = []
+    for start in range(0, len(rows), CHUNK_SIZE):
+        result = db.session.execute(insert(model).returning(model.id, sort_by_parameter_order=True), rows[start:start + CHUNK_SIZE])
+        ids.extend(result.scalars().all())
+    return ids
+
+def _insert(model, rows):
+    for start in range(0, len(rows), CHUNK_SIZE):
+        db.session.execute(insert(model), rows[start:start + CHUNK_SIZE])
+
+def seed(classes=5, students_per_class=100, exams_per_class=4, questions_per_exam=50,
+         submitted_fraction=0.8, seed_value=1):
+    """Inserts a synthetic school and returns a summary with the created logins and ids."""
+    rng = random.Random(seed_value)
+    tag = secrets.token_hex(3)
+    password_hash = generate_password_hash(SEED_PASSWORD)
+    now = datetime.now(pytz.utc)
+    class_names = [f'SEED-{tag}-{c + 1}' for c in range(classes)]
+
+    teacher_rows = [{
+        'fullname': f'Seed Teacher {c + 1}', 'email': f'seed-{tag}-teacher{c + 1}@example.com',
+        'password_hash': password_hash, 'role': 'teacher', 'status': 'approved', 'created_at': now
+    } for c in range(classes)]
+    teacher_ids = _insert_returning_ids(User, teacher_rows)
+
+    student_rows = [{
+        'fullname': f'Seed Student {c + 1}-{s + 1}', 'email': f'seed-{tag}-c{c + 1}s{s + 1}@example.com',
+        'password_hash': password_hash, 'role': 'student', 'status': 'approved',
+        'class_': class_names[c], 'created_at': now
+    } for c in range(classes) for s in range(students_per_class)]
+    student_ids = _insert_returning_ids(User, student_rows)
+    students_by_class = [student_ids[c * students_per_class:(c + 1) * students_per_class] for c in range(classes)]
+
+    exam_rows = [{
+        'title': f'Seed Exam {c + 1}.{e + 1}', 'duration': 60, 'teacher_id': teacher_ids[c],
+        'class_': class_names[c], 'randomize_questions': False, 'randomize_options': False, 'delay_results': False,
+        'created_at': now
+    } for c in range(classes) for e in range(exams_per_class)]
+    exam_ids = _insert_returning_ids(Exam, exam_rows)
+
+    question_rows = []
+    correct_by_exam = {}
+    for exam_id in exam_ids:
+        correct = [rng.randrange(4) for _ in range(questions_per_exam)]
+        correct_by_exam[exam_id] = correct
+        question_rows.extend({
+            'exam_id': exam_id, 'question_text': f'Seed question {q + 1}', 'question_type': 'single-choice',
+            'options': [{'text': f'Option {o + 1}', 'correct': o == correct[q]} for o in range(4)],
+            'correct_answer': [str(correct[q])]
+        } for q in range(questions_per_exam))
+    question_ids = _insert_returning_ids(Question, question_rows)
+    questions_by_exam = {exam_id: question_ids[i * questions_per_exam:(i + 1) * questions_per_exam]
+                         for i, exam_id in enumerate(exam_ids)}
+
+    submission_rows = []
+    answer_plan = []
+    for i, exam_id in enumerate(exam_ids):
+        for student_id in students_by_class[i // exams_per_class]:
+            if rng.random() >= submitted_fraction:
+                continue
+            picks = [rng.randrange(4) for _ in range(questions_per_exam)]
+            right = sum(1 for p, c in zip(picks, correct_by_exam[exam_id]) if p == c)
+            submission_rows.append({
+                'student_id': student_id, 'exam_id': exam_id, 'start_time': now, 'end_time': now,
+                'status': 'submitted', 'score': round(right / questions_per_exam * 100) if questions_per_exam else 0
+            })
+            answer_plan.append((exam_id, picks))
+    submission_ids = _insert_returning_ids(ExamSubmission, submission_rows)
+
+    _insert(StudentAnswer, [
+        {'submission_id': submission_id, 'question_id': question_id, 'answer_text': str(pick)}
+        for submission_id, (exam_id, picks) in zip(submission_ids, answer_plan)
+        for question_id, pick in zip(questions_by_exam[exam_id], picks)
+    ])
+    rebuild_exam_stats(exam_ids)  # as if every attempt had been submitted through the app
+    db.session.commit()
+
+    return {
+        'tag': tag,
+        'classes': class_names,
+        'teacher_emails': [row['email'] for row in teacher_rows],
+        'student_emails': [row['email'] for row in student_rows],
+        'password': SEED_PASSWORD,
+        'exam_ids': exam_ids,
+        'submissions': len(submission_ids),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--classes', type=int, default=5)
+    parser.add_argument('--students', type=int, default=100, help='students per class')
+    parser.add_argument('--exams', type=int, default=4, help='exams per class')
+    parser.add_argument('--questions', type=int, default=50, help='questions per exam')
+    parser.add_argument('--submitted', type=float, default=0.8, help='fraction of students who submitted each exam')
+    args = parser.parse_args()
+
+    with app.app_context():
+        summary = seed(args.classes, args.students, args.exams, args.questions, args.submitted)
+    print(f"Seeded tag {summary['tag']}: {len(summary['student_emails'])} students, "
+          f"{len(summary['exam_ids'])} exams, {summary['submissions']} submissions "
+          f"(password '{summary['password']}').")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+import os
+import pytest
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.pool import StaticPool
+from app import create_app
+from app.models import db, User
+from app import exam_paper, grading, identity
+
+# Set TEST_DATABASE_URL to a scratch Postgres database to run against the real
+# dialect; by default an in-memory SQLite database is used.
+TEST_DATABASE_URL = os.environ.get('TEST_DATABASE_URL')
+
+@compiles(JSONB, 'sqlite')
+def _jsonb_on_sqlite(type_, compiler, **kw):
+    return 'JSON'
+
+@pytest.fixture
+def app_config():
+    """Extra config for the app fixture; override it in a test module to change settings."""
+    return {}
+
+@pytest.fixture
+def app(app_config):
+    config = {
+        'TESTING': True,
+        'SECRET_KEY': 'test',
+        'SESSION_BACKEND': 'cookie',
+        'PERF_SERVER_TIMING': True,
+        'SQLALCHEMY_DATABASE_URI': TEST_DATABASE_URL or 'sqlite://',
+    }
+    if not TEST_DATABASE_URL:
+        config['SQLALCHEMY_ENGINE_OPTIONS'] = {'poolclass': StaticPool, 'connect_args': {'check_same_thread': False}}
+    config.update(app_config)
+    app = create_app(config)
+    # Each test starts with a fresh database whose ids repeat, so drop per-process caches.
+    identity._identity_cache.clear()
+    exam_paper._paper_cache.clear()
+    grading._answer_key_cache.clear()
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+def make_user(role, email, class_=None, status='approved'):
+    """Adds a user and returns its id. Call inside an app context."""
+    user = User(fullname=email.split('@')[0].title(), email=email, password_hash='x', role=role,
+                class_=class_, status=status)
+    db.session.add(user)
+    db.session.commit()
+    return user.id
+
+def login(client, user_id):
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+
+def query_count(response):
+    """Reads the number of SQL statements a request ran from its Server-Timing header."""
+    db_timing = response.headers['Server-Timing'].split(',')[0]
+    return int(db_timing.split('desc="')[1].split(' ')[0])
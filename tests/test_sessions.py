@@ -0,0 +1,74 @@
+import time
+from datetime import datetime, timedelta
+import pytest
+import pytz
+from app import sessions
+from app.sessions import DatabaseSessionStore, SessionStore
+from conftest import make_user, login
+
+@pytest.fixture
+def store(tmp_path):
+    return DatabaseSessionStore(f'sqlite:///{tmp_path}/sessions.db')
+
+@pytest.fixture
+def app_config(tmp_path):
+    return {'SESSION_BACKEND': 'database', 'SESSION_DATABASE_URL': f'sqlite:///{tmp_path}/sessions.db'}
+
+def in_minutes(minutes):
+    return datetime.now(pytz.utc) + timedelta(minutes=minutes)
+
+def test_session_store_is_abstract():
+    with pytest.raises(TypeError):
+        SessionStore()
+
+def test_save_and_load(store):
+    store.save('abc', '{"a": 1}', 7, in_minutes(30))
+    assert store.load('abc') == ('{"a": 1}', 7)
+    store.save('abc', '{"a": 2}', None, in_minutes(30))
+    assert store.load('abc') == ('{"a": 2}', None)
+    assert store.load('missing') is None
+
+def test_delete_user(store):
+    store.save('one', '{}', 7, in_minutes(30))
+    store.save('two', '{}', 7, in_minutes(30))
+    store.save('other', '{}', 8, in_minutes(30))
+    store.delete_user(7)
+    assert store.load('one') is None and store.load('two') is None
+    assert store.load('other') is not None
+
+def test_expired_sessions_are_not_loaded_and_get_purged(store):
+    store.save('old', '{}', 7, in_minutes(-1))
+    store.save('new', '{}', 7, in_minutes(30))
+    assert store.load('old') is None
+    assert store.purge() == 1
+    assert store.load('new') is not None
+
+class FakeClock:
+    def __init__(self):
+        self.now = time.time()
+
+    def time(self):
+        return self.now
+
+def test_refresh_session_slides_the_expiry(app, client, monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(sessions, 'time', clock)
+    with app.app_context():
+        user_id = make_user('student', 'student@example.com', class_='JSS1')
+    login(client, user_id)
+    store = app.session_interface.store
+
+    first = client.get('/profile')
+    assert 'Set-Cookie' in first.headers
+    sid = client.get_cookie('session').value
+
+    clock.now += 60
+    assert 'Set-Cookie' not in client.get('/profile').headers
+
+    lifetime = app.permanent_session_lifetime
+    clock.now += (lifetime * app.config['SESSION_REFRESH_FRACTION']).total_seconds()
+    assert 'Set-Cookie' in client.get('/profile').headers
+    assert client.get_cookie('session').value == sid
+    data, stored_user_id = store.load(app.session_interface._signer(app).unsign(sid).decode('ascii'))
+    assert stored_user_id == user_id
+    assert sessions.StoredSessionInterface.serializer.loads(data)['_refreshed_at'] == int(clock.now)
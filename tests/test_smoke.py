@@ -0,0 +1,11 @@
+import pytest
+from conftest import make_user, login
+
+@pytest.mark.parametrize('role', ['student', 'teacher', 'admin'])
+def test_profile_renders_for_each_role(app, client, role):
+    with app.app_context():
+        user_id = make_user(role, f'{role}@example.com', class_='JSS1' if role == 'student' else None)
+    login(client, user_id)
+    response = client.get('/profile')
+    assert response.status_code == 200
+    assert f'href="/{role}/dashboard"'.encode() in response.data
@@ -0,0 +1,13 @@
+import statistics
+import pytest
+from scripts.startup_benchmark import run_once, BOOT_BUDGET_MS, RSS_BUDGET_MB
+
+@pytest.mark.parametrize('blueprints', [None, ['auth', 'student']])
+def test_startup_leaves_heavy_libraries_unloaded(blueprints):
+    sample, _ = run_once(blueprints)
+    assert sample['lazy_loaded'] == []
+
+def test_startup_within_budget():
+    samples = [run_once(None)[0] for _ in range(3)]
+    assert statistics.median(s['seconds'] for s in samples) * 1000 < BOOT_BUDGET_MS
+    assert max(s['max_rss_mb'] for s in samples) < RSS_BUDGET_MB
@@ -0,0 +1,39 @@
+from datetime import datetime, timedelta
+import pytz
+from app.models import db, Exam, ExamSubmission, ExamStats
+from app.identity import invalidate_user
+from conftest import make_user, login, query_count
+
+def add_exams(app, teacher_id, count, student_ids):
+    now = datetime.now(pytz.utc)
+    with app.app_context():
+        for i in range(count):
+            exam = Exam(title=f'Exam {i}', duration=30, teacher_id=teacher_id, class_=f'JSS{i % 3 + 1}',
+                        created_at=now - timedelta(minutes=i))
+            db.session.add(exam)
+            db.session.flush()
+            for student_id in student_ids:
+                db.session.add(ExamSubmission(student_id=student_id, exam_id=exam.id, status='submitted',
+                                              start_time=now - timedelta(hours=1), end_time=now, score=1))
+            db.session.add(ExamStats(exam_id=exam.id, submission_count=len(student_ids)))
+        db.session.commit()
+
+def dashboard_queries(client, teacher_id):
+    invalidate_user(teacher_id)  # count the user load on every request
+    response = client.get('/teacher/dashboard')
+    assert response.status_code == 200
+    return query_count(response)
+
+def test_dashboard_query_count_does_not_grow_with_exams(app, client):
+    with app.app_context():
+        teacher_id = make_user('teacher', 'teacher@example.com')
+        student_ids = [make_user('student', f'student{i}@example.com', class_=f'JSS{i % 3 + 1}') for i in range(6)]
+    login(client, teacher_id)
+
+    add_exams(app, teacher_id, 1, student_ids)
+    one_exam = dashboard_queries(client, teacher_id)
+
+    add_exams(app, teacher_id, 24, student_ids)
+    many_exams = dashboard_queries(client, teacher_id)
+
+    assert one_exam == many_exams